@@ -0,0 +1,48 @@
+""" Generated benchmark models: a wide model, a chain of FKs, a model with M2Ms and many small models to register """
+import os
+
+from django.db import models
+
+from benchmarks.project import WIDE_FIELDS_ENV, DEPTH_ENV, MODELS_ENV
+
+WIDE_FIELDS = int(os.environ.get(WIDE_FIELDS_ENV, 40))
+DEPTH = int(os.environ.get(DEPTH_ENV, 4))
+MODELS = int(os.environ.get(MODELS_ENV, 100))
+
+
+def _model(name, fields):
+    attrs = {'__module__': __name__, '__str__': lambda self: f'{name.lower()}-{self.pk}', **fields}
+    model = type(name, (models.Model,), attrs)
+    globals()[name] = model
+    return model
+
+
+# Deep0 <- Deep1 <- ... <- Deep{DEPTH-1}
+DEEP_MODELS = []
+for i in range(DEPTH):
+    fields = {'name': models.CharField(max_length=64)}
+    if DEEP_MODELS:
+        fields['parent'] = models.ForeignKey(DEEP_MODELS[-1], on_delete=models.CASCADE)
+    DEEP_MODELS.append(_model(f'Deep{i}', fields))
+
+Tag = _model('Tag', {'name': models.CharField(max_length=64, unique=True)})
+
+Wide = _model('Wide', {
+    **{f'char_{i}': models.CharField(max_length=64) for i in range(WIDE_FIELDS // 2)},
+    **{f'int_{i}': models.IntegerField(default=0) for i in range(WIDE_FIELDS - WIDE_FIELDS // 2)},
+    'deep': models.ForeignKey(DEEP_MODELS[-1], on_delete=models.CASCADE),
+})
+
+Tagged = _model('Tagged', {
+    'name': models.CharField(max_length=64),
+    'deep': models.ForeignKey(DEEP_MODELS[-1], on_delete=models.CASCADE),
+    'tags': models.ManyToManyField(Tag),
+    'labels': models.ManyToManyField(Tag, related_name='labelled'),
+})
+
+# Registered only by the registration benchmarks
+REGISTRY_MODELS = [_model(f'Registry{i}', {'name': models.CharField(max_length=64),
+                                           'value': models.IntegerField(default=0),
+                                           'deep': models.ForeignKey(DEEP_MODELS[0], on_delete=models.CASCADE,
+                                                                     related_name=f'registry{i}_set')})
+                   for i in range(MODELS)]
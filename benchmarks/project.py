@@ -0,0 +1,43 @@
+""" Settings of the in-memory benchmark project, configured before django.setup() """
+import os
+
+import django
+from django.conf import settings
+
+# Sizes of the generated models, read by benchapp.models at import
+WIDE_FIELDS_ENV = 'CONDOR_BENCH_WIDE_FIELDS'
+DEPTH_ENV = 'CONDOR_BENCH_DEPTH'
+MODELS_ENV = 'CONDOR_BENCH_MODELS'
+
+
+def setup(wide_fields=40, depth=4, models=100):
+    os.environ[WIDE_FIELDS_ENV] = str(wide_fields)
+    os.environ[DEPTH_ENV] = str(depth)
+    os.environ[MODELS_ENV] = str(models)
+    settings.configure(
+        DEBUG=False,
+        SECRET_KEY='condor-benchmarks',
+        ALLOWED_HOSTS=['*'],
+        INSTALLED_APPS=['django.contrib.auth', 'django.contrib.contenttypes', 'django.contrib.sessions',
+                        'django.contrib.messages', 'django.contrib.staticfiles',
+                        'crispy_forms', 'crispy_bootstrap4', 'widget_tweaks', 'bootstrap_modal_forms',
+                        'django_select2', 'recurrence', 'condor_navigator', 'benchmarks.benchapp'],
+        CRISPY_TEMPLATE_PACK='bootstrap4',
+        MIDDLEWARE=['django.contrib.sessions.middleware.SessionMiddleware',
+                    'django.middleware.common.CommonMiddleware',
+                    'django.middleware.csrf.CsrfViewMiddleware',
+                    'django.contrib.auth.middleware.AuthenticationMiddleware',
+                    'django.contrib.messages.middleware.MessageMiddleware'],
+        ROOT_URLCONF='benchmarks.urls',
+        TEMPLATES=[{'BACKEND': 'django.template.backends.django.DjangoTemplates', 'APP_DIRS': True,
+                    'OPTIONS': {'context_processors': ['django.template.context_processors.request',
+                                                       'django.contrib.auth.context_processors.auth',
+                                                       'django.contrib.messages.context_processors.messages']}}],
+        DATABASES={'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}},
+        CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+        PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+        STATIC_URL='/static/',
+        USE_TZ=True,
+        DEFAULT_AUTO_FIELD='django.db.models.AutoField',
+    )
+    django.setup()
@@ -0,0 +1,180 @@
+""" Benchmarks of the navigator hot paths on an in-memory SQLite project with generated models.
+
+Run from the repository root:
+
+    python -m benchmarks.run --rows 1000 --output results.json
+    python -m benchmarks.run --rows 1000 --baseline results.json --tolerance 1.2
+
+Results (min/median/mean milliseconds of every benchmark) are written as JSON. With --baseline, the medians are
+compared with a previous run and the exit status is 1 if any benchmark is slower than baseline * tolerance.
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import warnings
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks import project
+
+
+def measure(function: Callable, repeat: int, setup: Callable = None, warmup=1) -> Dict:
+    """ Time repeat calls of function(setup()), after warmup untimed calls """
+    times = []
+    for i in range(warmup + repeat):
+        argument = setup() if setup is not None else None
+        start = time.perf_counter()
+        function(argument)
+        if i >= warmup:
+            times.append((time.perf_counter() - start) * 1000)
+    return {'repeat': repeat, 'min_ms': min(times), 'median_ms': statistics.median(times),
+            'mean_ms': statistics.fmean(times)}
+
+
+def seed(rows: int):
+    from benchmarks.benchapp.models import DEEP_MODELS, Tag, Wide, Tagged
+    parents = None
+    for model in DEEP_MODELS:
+        objects = [model(name=f'{model.__name__.lower()}-{i}') for i in range(max(rows // 10, 1))]
+        if parents is not None:
+            for i, obj in enumerate(objects):
+                obj.parent = parents[i % len(parents)]
+        parents = model.objects.bulk_create(objects)
+    tags = Tag.objects.bulk_create([Tag(name=f'tag-{i}') for i in range(20)])
+    wide_fields = [f for f in Wide._meta.concrete_fields if not f.primary_key and not f.is_relation]
+    Wide.objects.bulk_create([Wide(deep=parents[i % len(parents)],
+                                   **{f.name: (f'{f.name}-{i}' if f.get_internal_type() == 'CharField' else i)
+                                      for f in wide_fields})
+                              for i in range(rows)])
+    tagged = Tagged.objects.bulk_create([Tagged(name=f'tagged-{i}', deep=parents[i % len(parents)])
+                                         for i in range(rows)])
+    for field in ('tags', 'labels'):
+        through = Tagged._meta.get_field(field).remote_field.through
+        through.objects.bulk_create([through(tagged_id=obj.pk, tag_id=tags[(obj.pk + j) % len(tags)].pk)
+                                     for obj in tagged for j in range(3)])
+
+
+def fresh_navigator(function: Callable):
+    """ Run function(navigator) on a new CondorNavigator, restoring the navigator of the project afterwards """
+    from condor_navigator.navigator import CondorNavigator, Singleton
+    original = Singleton._instances.pop(CondorNavigator, None)
+    try:
+        return function(CondorNavigator())
+    finally:
+        Singleton._instances[CondorNavigator] = original
+
+
+def benchmarks(repeat: int) -> List[Tuple[str, Dict]]:
+    from django.contrib.auth.models import User
+    from django.test import Client
+
+    from benchmarks.benchapp.models import DEEP_MODELS, Wide, Tagged, REGISTRY_MODELS
+    from benchmarks.urls import navigator, PAGINATED_BY
+    from condor_navigator.templatetags.condor_tags import table_row, table_header
+
+    client = Client()
+    client.force_login(User.objects.create_superuser('bench', 'bench@example.com', 'bench'))
+
+    def get(url):
+        def request(_):
+            response = client.get(url)
+            assert response.status_code == 200, f'{url}: {response.status_code}'
+        return request
+
+    wide_page, tagged_page = navigator.get_model_lcrud_page(Wide), navigator.get_model_lcrud_page(Tagged)
+    wide_rows = list(wide_page.list_queryset()[:PAGINATED_BY])
+    tagged_rows = list(tagged_page.list_queryset()[:PAGINATED_BY])
+    deep = DEEP_MODELS[-1].objects.first()
+
+    def register(_):
+        fresh_navigator(lambda nav: nav.register_models(*REGISTRY_MODELS))
+
+    def registered_navigator():
+        return fresh_navigator(lambda nav: nav.register_models(*REGISTRY_MODELS))
+
+    def build_urls(nav):
+        return nav.urls
+
+    def table_rows(page, rows):
+        def render(_):
+            for obj in rows:
+                table_row(obj, page)
+        return render
+
+    cases = [
+        ('list_wide', get(f'/{wide_page.route}'), None),
+        ('list_tagged', get(f'/{tagged_page.route}'), None),
+        ('list_filtered', get(f'/{tagged_page.route}/deep-{deep.pk}'), None),
+        ('list_wide_last_page', get(f'/{wide_page.route}?page=last'), None),
+        ('read_modal_wide', get(f'/{wide_page.route}/{wide_rows[0].pk}/read'), None),
+        ('read_modal_tagged', get(f'/{tagged_page.route}/{tagged_rows[0].pk}/read'), None),
+        ('table_header_wide', lambda _: table_header(wide_page), None),
+        ('table_row_wide_page', table_rows(wide_page, wide_rows), None),
+        ('table_row_tagged_page', table_rows(tagged_page, tagged_rows), None),
+        ('register_models', register, None),
+        ('navigator_urls', build_urls, registered_navigator),
+    ]
+    return [(name, measure(function, repeat, setup)) for name, function, setup in cases]
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """ Names of the benchmarks whose median is above baseline median * tolerance, printing the comparison """
+    regressions = []
+    print(f'{"benchmark":<32}{"baseline ms":>14}{"current ms":>14}{"ratio":>8}', file=sys.stderr)
+    for name, current in results['results'].items():
+        previous = baseline['results'].get(name)
+        if previous is None:
+            print(f'{name:<32}{"-":>14}{current["median_ms"]:>14.3f}{"new":>8}', file=sys.stderr)
+            continue
+        ratio = current['median_ms'] / previous['median_ms'] if previous['median_ms'] else float('inf')
+        flag = ' !' if ratio > tolerance else ''
+        print(f'{name:<32}{previous["median_ms"]:>14.3f}{current["median_ms"]:>14.3f}{ratio:>8.2f}{flag}',
+              file=sys.stderr)
+        if ratio > tolerance:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Condor navigator benchmarks')
+    parser.add_argument('--rows', type=int, default=1000, help='rows seeded in the wide and M2M models')
+    parser.add_argument('--wide-fields', type=int, default=40, help='fields of the wide model')
+    parser.add_argument('--depth', type=int, default=4, help='length of the FK chain')
+    parser.add_argument('--models', type=int, default=100, help='models registered by the registration benchmarks')
+    parser.add_argument('--repeat', type=int, default=20, help='timed runs of every benchmark')
+    parser.add_argument('--output', help='write the results to this JSON file (default: stdout)')
+    parser.add_argument('--baseline', help='JSON results of a previous run to compare with')
+    parser.add_argument('--tolerance', type=float, default=1.25, help='allowed median ratio against the baseline')
+    args = parser.parse_args(argv)
+
+    project.setup(wide_fields=args.wide_fields, depth=args.depth, models=args.models)
+    import django
+    from django.core.management import call_command
+    from django.core.paginator import UnorderedObjectListWarning
+    warnings.filterwarnings('ignore', category=UnorderedObjectListWarning)
+    call_command('migrate', run_syncdb=True, verbosity=0)
+    seed(args.rows)
+
+    results = {'meta': {'python': platform.python_version(), 'django': django.get_version(),
+                        'rows': args.rows, 'wide_fields': args.wide_fields, 'depth': args.depth,
+                        'models': args.models, 'repeat': args.repeat},
+               'results': dict(benchmarks(args.repeat))}
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
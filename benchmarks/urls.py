@@ -0,0 +1,15 @@
+from django.urls import path, include
+from django.views.i18n import JavaScriptCatalog
+
+from benchmarks.benchapp.models import DEEP_MODELS, Tag, Wide, Tagged
+from condor_navigator.navigator import CondorNavigator
+
+PAGINATED_BY = 100
+
+navigator = CondorNavigator()
+navigator.register_models(*DEEP_MODELS, Tag, menus='deep')
+navigator.register_model(Wide, menus='bench', list_paginated_by=PAGINATED_BY)
+navigator.register_model(Tagged, menus='bench', list_paginated_by=PAGINATED_BY)
+
+urlpatterns = [path('jsi18n/', JavaScriptCatalog.as_view(), name='jsi18n'),
+               path('select2/', include('django_select2.urls'))] + navigator.urls
@@ -0,0 +1,243 @@
+import datetime
+import hashlib
+import time
+from typing import Type, Iterable, List, Optional, Tuple
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.core.cache import cache
+from django.db.models import Model, DateTimeField, Max, QuerySet
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.translation import get_language
+from django.views.decorators.http import condition
+
+# Validators fallback for models without a last modified field
+VERSION = 'version'
+
+# Names of the fields detected as last modified timestamps (when not auto_now)
+LAST_MODIFIED_NAMES = ('updated_at', 'modified_at', 'last_modified', 'updated', 'modified')
+
+
+def _version_key(model: Type[Model]):
+    return f'condor:version:{model._meta.label_lower}'
+
+
+def model_version(model: Type[Model]) -> int:
+    """ Version of the data of model, changed every time an instance is saved or deleted.
+
+    Versions are time based (ns) so they also tell when the data last changed, and are stored in the django cache
+    so they are shared by all the processes using it.
+    """
+    key = _version_key(model)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version if version is not None else time.time_ns()
+
+
+def model_versions(models: Iterable[Type[Model]]) -> List[int]:
+    """ Versions of models, read from the django cache in one round trip """
+    models = list(models)
+    versions = cache.get_many([_version_key(m) for m in models])
+    return [versions[_version_key(m)] if _version_key(m) in versions else model_version(m) for m in models]
+
+
+def bump_model_version(model: Type[Model]):
+    cache.set(_version_key(model), time.time_ns(), None)
+
+
+def _on_model_changed(sender, **kwargs):
+    bump_model_version(sender)
+
+
+def _on_m2m_changed(sender, instance, model, action, **kwargs):
+    if action.startswith('post_'):
+        bump_model_version(type(instance))
+        bump_model_version(model)
+
+
+def watch_model(model: Type[Model]):
+    """ Bump the version of model when one of its instances is saved or deleted, or its M2M relations change """
+    uid = f'condor_watch_{model._meta.label_lower}'
+    post_save.connect(_on_model_changed, sender=model, dispatch_uid=uid)
+    post_delete.connect(_on_model_changed, sender=model, dispatch_uid=uid)
+    through_models = [f.remote_field.through for f in model._meta.local_many_to_many] + \
+                     [r.through for r in model._meta.related_objects if r.many_to_many]
+    for through in through_models:
+        if not isinstance(through, str):
+            m2m_changed.connect(_on_m2m_changed, sender=through, dispatch_uid=f'condor_watch_{through._meta.label_lower}')
+
+
+def permissions_signature(user, permissions: Iterable[str] = None) -> str:
+    """ Short signature of the permissions of user, restricted to permissions if given, to key per-user caches.
+
+    Users with the same (relevant) permissions share the signature. Computing it costs at most one permissions
+    lookup, cached on the user object by the auth backends.
+    """
+    if user is None or not user.is_authenticated:
+        return 'anonymous'
+    if not user.is_active:
+        return 'inactive'
+    if user.is_superuser:
+        return 'superuser'
+    if permissions is not None and not permissions:
+        return 'user'
+    user_permissions = user.get_all_permissions()
+    if permissions is not None:
+        user_permissions = user_permissions & set(permissions)
+    return hashlib.md5(','.join(sorted(user_permissions)).encode()).hexdigest()
+
+
+class ResponseCache:
+    """ Cache of the rendered GET responses of a page, invalidated by the versions of the models it shows.
+
+    Responses are keyed by route, url kwargs, querystring, permissions signature of the user and language, together
+    with the versions of the watched models: saving or deleting any of them makes the previous entries unreachable.
+    Hits and misses are counted per process.
+    """
+    def __init__(self, models: Iterable[Type[Model]], timeout=300):
+        self.models = tuple(dict.fromkeys(models))
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        for model in self.models:
+            watch_model(model)
+
+    def key(self, request, route_name: str, kwargs: dict, permissions: Iterable[str] = None) -> str:
+        parts = [route_name, sorted((k, str(v)) for k, v in kwargs.items() if v is not None),
+                 sorted(request.GET.lists()), permissions_signature(request.user, permissions),
+                 get_language(), request.get_full_path_info().split('?')[0], model_versions(self.models)]
+        return f'condor:response:{route_name}:{hashlib.md5(repr(parts).encode()).hexdigest()}'
+
+    def get(self, key) -> Optional[HttpResponse]:
+        cached = cache.get(key)
+        if cached is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        content, content_type = cached
+        return HttpResponse(content, content_type=content_type)
+
+    def set(self, key, response: HttpResponse):
+        """ Store response, if it is a plain 200 response not setting cookies """
+        if response.status_code != 200 or response.streaming or response.cookies:
+            return
+        if callable(getattr(response, 'render', None)):
+            response.render()
+        cache.set(key, (response.content, response['Content-Type']), self.timeout)
+
+    @property
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'hit_ratio': self.hits / lookups if lookups else None}
+
+
+def cache_responses(view, page):
+    """ Wrap the view function of page, serving GET requests from page.response_cache """
+    def lookup(request, kwargs):
+        permissions = set(page.permissions) | set(page.navigator.menus_permissions)
+        key = page.response_cache.key(request, page.route_name, kwargs, permissions)
+        return key, page.response_cache.get(key)
+
+    if iscoroutinefunction(view):
+        async def cached_view(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return await view(request, *args, **kwargs)
+            key, response = await sync_to_async(lookup)(request, kwargs)
+            if response is None:
+                response = await view(request, *args, **kwargs)
+                await sync_to_async(page.response_cache.set)(key, response)
+            return response
+        return cached_view
+
+    def cached_view(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return view(request, *args, **kwargs)
+        key, response = lookup(request, kwargs)
+        if response is None:
+            response = view(request, *args, **kwargs)
+            page.response_cache.set(key, response)
+        return response
+    return cached_view
+
+
+def detect_last_modified_field(model: Type[Model]) -> Optional[str]:
+    """ Name of the auto_now (or updated_at-like) DateTimeField of model, None if there is not one """
+    fields = [f for f in model._meta.concrete_fields if isinstance(f, DateTimeField)]
+    for field in fields:
+        if field.auto_now:
+            return field.name
+    for field in fields:
+        if field.name in LAST_MODIFIED_NAMES:
+            return field.name
+    return None
+
+
+class ConditionalGet:
+    """ ETag and Last-Modified validators of the responses of a page, computed without running the page query.
+
+    The validators combine the max last_modified_field of the rows shown (one aggregate query) with the versions of
+    the models shown, that also catch deletions. When the model has no last modified field the versions alone are
+    used, unless fallback is None: then the page does not answer conditional requests.
+    The ETag also covers url kwargs, querystring, permissions signature and language.
+    """
+    def __init__(self, model: Type[Model], models: Iterable[Type[Model]], last_modified_field=None, fallback=VERSION):
+        assert fallback in (VERSION, None), f'fallback must be {VERSION!r} or None'
+        self.model = model
+        self.models = tuple(dict.fromkeys(models))
+        self.last_modified_field = detect_last_modified_field(model) if last_modified_field is None \
+            else last_modified_field or None
+        self.fallback = fallback
+        if fallback == VERSION:
+            for m in self.models:
+                watch_model(m)
+
+    @property
+    def enabled(self) -> bool:
+        return self.last_modified_field is not None or self.fallback == VERSION
+
+    def validators(self, request, route_name: str, kwargs: dict, queryset: QuerySet = None,
+                   permissions: Iterable[str] = None) -> Tuple[Optional[str], Optional[datetime.datetime]]:
+        """ (etag, last_modified) of the response to request, computed once per request """
+        if getattr(request, '_condor_validators', None) is not None:
+            return request._condor_validators
+        timestamps = []
+        if self.last_modified_field is not None and queryset is not None:
+            last_modified = queryset.order_by().aggregate(last_modified=Max(self.last_modified_field))['last_modified']
+            if last_modified is not None:
+                if timezone.is_naive(last_modified):
+                    last_modified = timezone.make_aware(last_modified, datetime.timezone.utc)
+                timestamps.append(last_modified)
+        versions = model_versions(self.models) if self.fallback == VERSION else []
+        timestamps += [datetime.datetime.fromtimestamp(v / 1e9, datetime.timezone.utc) for v in versions]
+        parts = [route_name, sorted((k, str(v)) for k, v in kwargs.items() if v is not None),
+                 sorted(request.GET.lists()), permissions_signature(request.user, permissions), get_language(),
+                 versions, [t.isoformat() for t in timestamps]]
+        etag = hashlib.md5(repr(parts).encode()).hexdigest()
+        request._condor_validators = etag, max(timestamps) if timestamps else None
+        return request._condor_validators
+
+
+def conditional_responses(view, page):
+    """ Wrap the view function of page, answering conditional GET requests with 304 through page.conditional_get """
+    def validators(request, kwargs):
+        permissions = set(page.permissions) | set(page.navigator.menus_permissions)
+        return page.conditional_get.validators(request, page.route_name, kwargs,
+                                               page.validator_queryset(request, kwargs), permissions)
+
+    def etag(request, *args, **kwargs):
+        return validators(request, kwargs)[0]
+
+    def last_modified(request, *args, **kwargs):
+        return validators(request, kwargs)[1]
+
+    conditional_view = condition(etag_func=etag, last_modified_func=last_modified)(view)
+    if iscoroutinefunction(view):
+        async def precomputed_conditional_view(request, *args, **kwargs):
+            # Validators query the database: compute them (memoized on request) out of the event loop
+            await sync_to_async(validators)(request, kwargs)
+            return await conditional_view(request, *args, **kwargs)
+        return precomputed_conditional_view
+    return conditional_view
@@ -0,0 +1,99 @@
+import threading
+import time
+from typing import Type, Dict, Tuple, List, Optional
+
+from django.db.models import Model, QuerySet
+from django.forms import ModelChoiceField, ModelMultipleChoiceField
+from django.forms.models import ModelChoiceIterator
+
+from condor_navigator.cache import model_version, watch_model
+from condor_navigator.pagination import EstimatedCount
+
+# Seconds after which cached choices are reloaded even if the model version did not change
+# (e.g. rows changed with QuerySet.update(), that sends no signals)
+CHOICES_MAX_AGE = 300
+# Largest tables whose choices are cached, when the navigator has no autocomplete_threshold
+CHOICES_MAX_ROWS = 200
+
+# {(model, db alias, ordering): (version, load time, objects or None if the table is too large to be cached)}
+_choices: Dict[Tuple[Type[Model], str, Tuple], Tuple[int, float, Optional[List[Model]]]] = {}
+_choices_lock = threading.Lock()
+
+
+def is_cacheable(queryset: QuerySet) -> bool:
+    """ True if queryset selects all the rows of its model: filtered or sliced querysets are not cached """
+    query = queryset.query
+    return not query.where and query.low_mark == 0 and query.high_mark is None and not query.annotations
+
+
+def choices_max_rows() -> int:
+    """ Largest number of rows of a cached table: the autocomplete threshold of the navigator (larger tables are
+    edited with autocomplete widgets) """
+    from condor_navigator.navigator import CondorNavigator
+    threshold = CondorNavigator().autocomplete_threshold
+    return CHOICES_MAX_ROWS if threshold is None else threshold
+
+
+def cached_choice_objects(queryset: QuerySet) -> Optional[List[Model]]:
+    """ Objects of the (unfiltered) queryset, loaded once per process and per version of its model.
+    None if the queryset is filtered, or its table has more than choices_max_rows() rows (by a bounded count). """
+    if not is_cacheable(queryset):
+        return None
+    model = queryset.model
+    key = (model, queryset.db, tuple(queryset.query.order_by) or tuple(model._meta.ordering))
+    version = model_version(model)
+    cached = _choices.get(key)
+    if cached is not None and cached[0] == version and time.monotonic() - cached[1] < CHOICES_MAX_AGE:
+        return cached[2]
+    max_rows = choices_max_rows()
+    count, exact = EstimatedCount(cap=max_rows).count(queryset)
+    objects = list(queryset) if exact and count <= max_rows else None
+    with _choices_lock:
+        _choices[key] = (version, time.monotonic(), objects)
+    return objects
+
+
+def clear_cached_choices(model: Type[Model] = None):
+    with _choices_lock:
+        if model is None:
+            _choices.clear()
+        else:
+            for key in [key for key in _choices if key[0] is model]:
+                del _choices[key]
+
+
+class CachedModelChoiceIterator(ModelChoiceIterator):
+    """ Choices of a model choice field, read from the process choices cache when the queryset is not filtered """
+    def _objects(self):
+        objects = cached_choice_objects(self.queryset)
+        return objects if objects is not None else self.queryset
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield "", self.field.empty_label
+        for obj in self._objects():
+            yield self.choice(obj)
+
+    def __len__(self):
+        objects = cached_choice_objects(self.queryset)
+        count = len(objects) if objects is not None else self.queryset.count()
+        return count + (1 if self.field.empty_label is not None else 0)
+
+    def __bool__(self):
+        return self.field.empty_label is not None or len(self) > 0
+
+
+class CachedModelChoiceField(ModelChoiceField):
+    iterator = CachedModelChoiceIterator
+
+    def __init__(self, queryset, **kwargs):
+        super().__init__(queryset, **kwargs)
+        watch_model(queryset.model)
+
+
+class CachedModelMultipleChoiceField(ModelMultipleChoiceField):
+    iterator = CachedModelChoiceIterator
+
+    def __init__(self, queryset, **kwargs):
+        super().__init__(queryset, **kwargs)
+        watch_model(queryset.model)
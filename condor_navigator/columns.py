@@ -0,0 +1,93 @@
+from typing import NamedTuple, Callable, Optional, Tuple, Type
+
+from django.db.models import Model
+from django.utils.html import format_html
+
+from condor_navigator.routes import RouteUrlCache
+
+# Cell renderer kinds
+PLAIN = 'plain'
+FK_LINK = 'fk_link'
+M2M_JOIN = 'm2m_join'
+ID_LINK = 'id_link'
+
+
+class Column(NamedTuple):
+    """ A compiled list column: how to fetch the cell value from a row and how to render it """
+    name: str
+    verbose_name: str
+    kind: str
+    accessor: Callable
+    urls: RouteUrlCache
+    link_template: Optional[str] = None
+    route_name: Optional[str] = None
+    route_with_pk: bool = False
+    header_route_name: Optional[str] = None
+
+    def url(self, pk):
+        if self.route_with_pk:
+            return self.urls.url(self.route_name, pk)
+        return self.urls.url(self.route_name)
+
+    def cell(self, obj):
+        value = self.accessor(obj)
+        if self.kind == PLAIN:
+            return str(value)
+        if self.kind == M2M_JOIN:
+            return ', '.join([str(v) for v in value.all()])
+        if self.kind == FK_LINK:
+            if value is None:
+                return str(value)
+            return format_html(self.link_template, self.url(value.pk), value)
+        # ID_LINK
+        return format_html(self.link_template, self.url(value), value)
+
+    def text(self, obj) -> str:
+        """ Cell value as plain text, as displayed in the list """
+        value = self.accessor(obj)
+        if self.kind == M2M_JOIN:
+            return ', '.join([str(v) for v in value.all()])
+        return '' if value is None else str(value)
+
+    def data(self, obj):
+        """ Cell value as a JSON serializable value: related objects as their str, M2Ms as lists """
+        value = self.accessor(obj)
+        if self.kind == M2M_JOIN:
+            return [str(v) for v in value.all()]
+        if isinstance(value, Model):
+            return str(value)
+        return value
+
+    def header(self):
+        if self.header_route_name is not None:
+            return format_html("<a href='{}'><u>{}</u></a>", self.urls.url(self.header_route_name), self.verbose_name)
+        return self.verbose_name
+
+
+class RelatedColumn(NamedTuple):
+    """ A reverse FK list column: link to the related rows pointing to the row through fk_name """
+    fk_name: str
+    model: Type[Model]
+    count_annotation: str
+
+
+class ColumnPlan:
+    """ Immutable, ordered set of columns compiled once per ListPage and run for every row """
+    def __init__(self, columns: Tuple[Column, ...]):
+        self._columns = tuple(columns)
+        self._row_template = "<td>{}</td>" * len(self._columns)
+        self._header_template = "<th>{}</th>" * len(self._columns)
+
+    @property
+    def columns(self) -> Tuple[Column, ...]:
+        return self._columns
+
+    @property
+    def names(self) -> Tuple[str, ...]:
+        return tuple(c.name for c in self._columns)
+
+    def render_row(self, obj):
+        return format_html(self._row_template, *[c.cell(obj) for c in self._columns])
+
+    def render_header(self):
+        return format_html(self._header_template, *[c.header() for c in self._columns])
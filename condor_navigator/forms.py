@@ -1,3 +1,5 @@
+import copy
+
 from bootstrap_modal_forms.forms import BSModalModelForm
 from django.db.models import Model, ManyToManyField, DateField
 from django.db.models.fields.related_descriptors import ManyToManyDescriptor
@@ -5,7 +7,10 @@ from django.urls import reverse_lazy
 from django_addanother.widgets import AddAnotherWidgetWrapper, AddAnotherEditSelectedWidgetWrapper
 from django import forms
 
-from condor_navigator.widgets import FengyuanChenDatePickerInput, BootstrapDatePickerInput
+from condor_navigator.choices import CachedModelChoiceField, CachedModelMultipleChoiceField
+from condor_navigator.pagination import EstimatedCount
+from condor_navigator.widgets import FengyuanChenDatePickerInput, BootstrapDatePickerInput, CondorModelSelect2Widget, \
+    CondorModelSelect2MultipleWidget
 
 
 def get_add_another_widgets(condor_model):
@@ -34,7 +39,7 @@ def get_select2_multiple_widgets(condor_model, widgets: dict):
         try:
             attrib = condor_model.__getattribute__(condor_model, k)
             if isinstance(attrib, ManyToManyDescriptor):
-                widgets[attrib.field.id] = s2forms.Select2MultipleWidget(attrs={'class': 'form-control s2 pb-4',
+                widgets[attrib.field.name] = s2forms.Select2MultipleWidget(attrs={'class': 'form-control s2 pb-4',
                                                                             'multiple': 'multiple',
                                                                             'data-width': '100%'})
         except:
@@ -45,14 +50,49 @@ def get_select2_multiple_widgets(condor_model, widgets: dict):
     return widgets
 
 
+def get_autocomplete_widgets(condor_model, widgets: dict):
+    """ Autocomplete widgets for the FK and M2M fields whose related table has more rows than the navigator
+    autocomplete_threshold (estimated), when the related model has an autocomplete page """
+    from condor_navigator.navigator import CondorNavigator
+    navigator = CondorNavigator()
+    threshold = navigator.autocomplete_threshold
+    if threshold is None:
+        return widgets
+    for field in condor_model._meta.fields + condor_model._meta.many_to_many:
+        if not (field.many_to_one or field.many_to_many):
+            continue
+        page = navigator.get_model_autocomplete_page(field.related_model)
+        if page is None:
+            continue
+        count, _ = EstimatedCount(threshold).count(field.related_model._default_manager.all())
+        if count > threshold:
+            widget_class = CondorModelSelect2MultipleWidget if field.many_to_many else CondorModelSelect2Widget
+            widgets[field.name] = widget_class(data_url=reverse_lazy(page.route_name))
+    return widgets
+
+
 def inject_custom_widgets(condor_model):
     widgets = {}
     widgets = get_select2_multiple_widgets(condor_model, widgets)
+    widgets = get_autocomplete_widgets(condor_model, widgets)
     for field in condor_model._meta.fields:
         if isinstance(field, DateField):
             widgets[field.name] = BootstrapDatePickerInput()
     return widgets
 
+def inject_cached_choice_fields(condor_model, widgets: dict):
+    """ FK and M2M form fields reading their choices from the process choices cache, but the fields edited with
+    autocomplete widgets (their choices are never rendered) """
+    field_classes = {}
+    for field in condor_model._meta.fields + condor_model._meta.many_to_many:
+        if isinstance(widgets.get(field.name), (CondorModelSelect2Widget, CondorModelSelect2MultipleWidget)):
+            continue
+        if field.many_to_one or field.one_to_one:
+            field_classes[field.name] = CachedModelChoiceField
+        elif field.many_to_many:
+            field_classes[field.name] = CachedModelMultipleChoiceField
+    return field_classes
+
 def inject_custom_input_formats(condor_model):
     input_formats = {}
     for field in condor_model._meta.fields:
@@ -60,8 +100,18 @@ def inject_custom_input_formats(condor_model):
             input_formats[field.name] = '%m/%d/%Y'
     return input_formats
 
+_condor_forms = {}
+_readonly_condor_forms = {}
+
 def condor_bsmf_form(condor_model, condor_fields='__all__', exclude_fields=('id',)):
-    exclude_fields = tuple() if exclude_fields is None else exclude_fields
+    """ Bootstrap modal form class of condor_model, memoized by (model, fields, exclude) """
+    exclude_fields = tuple() if exclude_fields is None else tuple(exclude_fields)
+    key = (condor_model, condor_fields if isinstance(condor_fields, str) else tuple(condor_fields), exclude_fields)
+    if key not in _condor_forms:
+        _condor_forms[key] = _build_condor_bsmf_form(condor_model, condor_fields, exclude_fields)
+    return _condor_forms[key]
+
+def _build_condor_bsmf_form(condor_model, condor_fields, exclude_fields):
     class CondorForm(BSModalModelForm):
         class Meta:
             model = condor_model
@@ -70,12 +120,21 @@ def condor_bsmf_form(condor_model, condor_fields='__all__', exclude_fields=('id'
             input_formats = inject_custom_input_formats(condor_model)
             # widgets = condor_model, get_add_another_widgets(condor_model)
             widgets = inject_custom_widgets(condor_model)
+            field_classes = inject_cached_choice_fields(condor_model, widgets)
 
         @classmethod
         def set_readonly(cls, readonly=True):
-            for field in cls.base_fields.keys():
-                cls.base_fields[field].disabled = readonly
-            return cls
+            """ Subclass of cls with all the fields disabled (or enabled), memoized. cls is shared by the pages of
+            the model and is not changed. """
+            key = (cls, readonly)
+            if key not in _readonly_condor_forms:
+                base_fields = copy.deepcopy(cls.base_fields)
+                for field in base_fields.values():
+                    field.disabled = readonly
+                readonly_form = type(cls.__name__, (cls,), {'__module__': cls.__module__})
+                readonly_form.base_fields = base_fields
+                _readonly_condor_forms[key] = readonly_form
+            return _readonly_condor_forms[key]
 
     return CondorForm
 
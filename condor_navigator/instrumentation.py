@@ -0,0 +1,150 @@
+import bisect
+import threading
+import time
+from contextlib import ExitStack
+from typing import Dict, Optional
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.db import connections
+from django.template.response import SimpleTemplateResponse
+
+# Upper bounds (milliseconds) of the buckets of the request time histograms, the last bucket is unbounded
+HISTOGRAM_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class QueryCollector:
+    """ execute_wrapper counting the queries of a request and the time spent in the database """
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.queries += 1
+
+    def install(self) -> ExitStack:
+        """ Wrap the connections of the current thread, until the returned stack is closed """
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(self))
+        return stack
+
+
+class RouteStats:
+    """ Totals, maxima and request time histogram of the requests to a route """
+    def __init__(self):
+        self.requests = 0
+        self.queries = 0
+        self.max_queries = 0
+        self.db_time = 0.0
+        self.render_time = 0.0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.response_bytes = 0
+        self.max_response_bytes = 0
+        self.histogram = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+
+    def record(self, queries: int, db_time: float, render_time: float, total_time: float, response_bytes: int):
+        self.requests += 1
+        self.queries += queries
+        self.max_queries = max(self.max_queries, queries)
+        self.db_time += db_time
+        self.render_time += render_time
+        self.total_time += total_time
+        self.max_time = max(self.max_time, total_time)
+        self.response_bytes += response_bytes
+        self.max_response_bytes = max(self.max_response_bytes, response_bytes)
+        self.histogram[bisect.bisect_left(HISTOGRAM_BUCKETS_MS, total_time * 1000)] += 1
+
+    def as_dict(self) -> Dict:
+        """ Totals and per request means (times in milliseconds) """
+        n = self.requests or 1
+        return {'requests': self.requests,
+                'queries': self.queries, 'mean_queries': self.queries / n, 'max_queries': self.max_queries,
+                'db_ms': self.db_time * 1000, 'mean_db_ms': self.db_time * 1000 / n,
+                'render_ms': self.render_time * 1000, 'mean_render_ms': self.render_time * 1000 / n,
+                'total_ms': self.total_time * 1000, 'mean_ms': self.total_time * 1000 / n,
+                'max_ms': self.max_time * 1000,
+                'response_bytes': self.response_bytes, 'mean_response_bytes': self.response_bytes / n,
+                'max_response_bytes': self.max_response_bytes,
+                'histogram': {'buckets_ms': list(HISTOGRAM_BUCKETS_MS) + [None], 'counts': list(self.histogram)}}
+
+
+class InstrumentationStore:
+    """ In-process statistics of the instrumented requests, by route name """
+    def __init__(self):
+        self._routes: Dict[str, RouteStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, route_name: str, **sample):
+        with self._lock:
+            stats = self._routes.get(route_name)
+            if stats is None:
+                stats = self._routes[route_name] = RouteStats()
+            stats.record(**sample)
+
+    def stats(self, route_name: Optional[str] = None) -> Dict[str, Dict]:
+        """ {route name: statistics}, slowest routes (by total time) first """
+        with self._lock:
+            routes = {name: stats.as_dict() for name, stats in self._routes.items()
+                      if route_name is None or name == route_name}
+        return dict(sorted(routes.items(), key=lambda item: item[1]['total_ms'], reverse=True))
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+store = InstrumentationStore()
+
+
+def _render(response):
+    """ Render a template response still to be rendered, returns the render time """
+    if not isinstance(response, SimpleTemplateResponse) or response.is_rendered:
+        return 0.0
+    start = time.perf_counter()
+    response.render()
+    return time.perf_counter() - start
+
+
+def _response_bytes(response) -> int:
+    return 0 if getattr(response, 'streaming', False) else len(response.content)
+
+
+def instrument(view, page):
+    """ Wrap the view function of page, recording its requests in store while page.is_instrumented.
+    Template responses are rendered within the measure, to time the rendering and count its queries. """
+    if iscoroutinefunction(view):
+        async def instrumented_view(request, *args, **kwargs):
+            if not page.is_instrumented:
+                return await view(request, *args, **kwargs)
+            start, collector = time.perf_counter(), QueryCollector()
+            # ORM calls of the request run in its thread sensitive thread: wrap the connections of that thread
+            stack = await sync_to_async(collector.install)()
+            try:
+                response = await view(request, *args, **kwargs)
+                render_time = await sync_to_async(_render)(response)
+            finally:
+                await sync_to_async(stack.close)()
+            store.record(page.route_name, queries=collector.queries, db_time=collector.db_time,
+                         render_time=render_time, total_time=time.perf_counter() - start,
+                         response_bytes=_response_bytes(response))
+            return response
+        return instrumented_view
+
+    def instrumented_view(request, *args, **kwargs):
+        if not page.is_instrumented:
+            return view(request, *args, **kwargs)
+        start, collector = time.perf_counter(), QueryCollector()
+        with collector.install():
+            response = view(request, *args, **kwargs)
+            render_time = _render(response)
+        store.record(page.route_name, queries=collector.queries, db_time=collector.db_time,
+                     render_time=render_time, total_time=time.perf_counter() - start,
+                     response_bytes=_response_bytes(response))
+        return response
+    return instrumented_view
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+from django.urls import get_resolver
+
+from condor_navigator.search import search_indexes
+
+
+class Command(BaseCommand):
+    help = 'Create (or drop) and fill the full-text search index tables of the models with searchable_fields.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Database to create the indexes in.')
+        parser.add_argument('--drop', action='store_true', help='Drop the index tables before creating them.')
+        parser.add_argument('--no-rebuild', action='store_true', help='Only create the tables, do not index rows.')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Rows indexed per batch.')
+
+    def handle(self, *args, **options):
+        # Search indexes are registered with the navigator pages, which are built when the urlconf is loaded
+        get_resolver().url_patterns
+        using = options['database']
+        for index in search_indexes():
+            if options['drop']:
+                index.drop(using)
+            index.create(using)
+            message = f'{index.model._meta.label}: {index.table_name}'
+            if not options['no_rebuild']:
+                count = index.rebuild(using, chunk_size=options['chunk_size'])
+                message += f' ({count} rows indexed)'
+            self.stdout.write(message)
@@ -1,8 +1,23 @@
-from typing import List, Dict, Tuple, Set, Union, TypeVar, Type
+import hashlib
+import logging
+import time
+import warnings
+from types import MappingProxyType
+from typing import List, Dict, Tuple, Set, Union, TypeVar, Type, Mapping, Optional
+from django.core.cache import cache
 from django.db.models import Model
+from django.template.loader import render_to_string
+from django.urls import get_script_prefix
+from django.utils.safestring import mark_safe
+from django.utils.translation import get_language
 
+from condor_navigator.cache import permissions_signature
 from condor_navigator.page import CondorModelPage, CondorPage
 from condor_navigator.pages.crud import ListCRUDPage
+from condor_navigator.pagination import OFFSET
+from condor_navigator.routes import RouteUrlCache
+
+logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
 Iterable = Union[Tuple[T], List[T], Set[T]]
@@ -18,15 +33,23 @@ class Singleton(type):
 class MenuEntry:
     def __init__(self, name: str, pages: List[CondorPage]=None, expanded=False):
         self._name = name
-        self._pages = pages if pages is not None else []
+        self._pages: Dict[str, CondorPage] = {}
+        self._pages_view = None
         self.expanded = expanded
+        if pages is not None:
+            self.add(*pages)
 
     def add(self, *pages: CondorPage):
-        self._pages += [p for p in pages]
+        """ Add the pages that are not already in the menu (by route name) """
+        for p in pages:
+            self._pages.setdefault(p.route_name, p)
+        self._pages_view = None
 
     @property
-    def pages(self):
-        return self._pages
+    def pages(self) -> Tuple[CondorPage, ...]:
+        if self._pages_view is None:
+            self._pages_view = tuple(self._pages.values())
+        return self._pages_view
 
     @property
     def name(self):
@@ -35,21 +58,42 @@ class MenuEntry:
 
 
 class CondorNavigator(metaclass=Singleton):
-    def __init__(self, base_route='condor', page_title=None, menu_title=None):
+    def __init__(self, base_route='condor', page_title=None, menu_title=None, menu_cache_timeout=300,
+                 autocomplete_threshold=200, async_views=False, instrumentation=False):
         self.page_title = 'Condor Navigator' if page_title is None else page_title
         self.menu_title = 'Condor Menu' if menu_title is None else menu_title
+        self.menu_cache_timeout = menu_cache_timeout
+        # Related tables with more rows are edited with autocomplete widgets (None: never)
+        self.autocomplete_threshold = autocomplete_threshold
+        # Default of the pages with an async view (list and read pages), overridden by their async_view option
+        self.async_views = async_views
+        # Record query count/time, render time and response size of the requests to every page (see is_instrumented)
+        self.instrumentation = instrumentation
 
         self._login_url = '/accounts/login'
         self._logout_url = '/accounts/logout'
         self._not_logged_url = '/'
         self._base_route = base_route
-        self._pages = []
+        self._pages: Dict[str, CondorPage] = {}
+        self._pages_view = None
         self._menus: Dict[str, MenuEntry] = {}
+        self._menus_view = MappingProxyType(self._menus)
         self._models_default_pages: Dict[Type[Model], CondorPage] = {}
         self._models_lcrud_pages: Dict[Type[Model], ListCRUDPage] = {}
+        self._models_lookup_cache: Dict[Tuple[str, Type[Model]], Optional[CondorPage]] = {}
+        self._version = 0
+        self._menus_signature = None
+        self._menus_permissions = None
+        self._route_urls = RouteUrlCache()
+        self._registration_timings: Dict[Type[Model], float] = {}
+        self._urls_timing = None
 
         from .pages.index import IndexPage
+        from .pages.instrumentation import InstrumentationPage
         self.add_page(IndexPage('index'))
+        if instrumentation:
+            # Turning instrumentation on later needs the page added explicitly: add_page(InstrumentationPage(...))
+            self.add_page(InstrumentationPage('instrumentation'))
 
 
     @property
@@ -65,32 +109,115 @@ class CondorNavigator(metaclass=Singleton):
         return self._not_logged_url
 
     @property
-    def pages(self) -> List[CondorPage]:
-        """ Get a shallow copy of pages list """
-        return [p for p in self._pages]
+    def pages(self) -> Tuple[CondorPage, ...]:
+        """ Registered pages, in registration order (immutable, cached until pages change) """
+        if self._pages_view is None:
+            self._pages_view = tuple(self._pages.values())
+        return self._pages_view
 
-    def get_model_default_page(self, model: Type[Model]):
+    @property
+    def version(self) -> int:
+        """ Counter incremented every time pages, menus or models registration change """
+        return self._version
+
+    def get_page(self, route_name: str) -> Optional[CondorPage]:
+        return self._pages.get(route_name)
+
+    @property
+    def route_urls(self) -> RouteUrlCache:
+        return self._route_urls
+
+    def route_url(self, route_name: str, value=None, kwarg='pk') -> str:
+        """ Url of a registered route, built from the cached route template instead of calling reverse() """
+        return self._route_urls.url(route_name, value, kwarg)
+
+    def warm_route_urls(self):
+        """ Precompute the url templates of all the registered routes (the urlconf must be loaded) """
+        self._route_urls.warm(self.pages)
+        return self
+
+    def _lookup_model_page(self, kind: str, pages: Dict[Type[Model], CondorPage], model: Type[Model]):
+        """ Page registered for model or, for proxy models and subclasses, for the closest registered base """
         try:
-            return self._models_default_pages[model]
+            return pages[model]
         except KeyError:
-            return None
+            pass
+        try:
+            return self._models_lookup_cache[(kind, model)]
+        except KeyError:
+            pass
+        page = None
+        for base in getattr(model, '__mro__', ()):
+            if base in pages:
+                page = pages[base]
+                break
+        self._models_lookup_cache[(kind, model)] = page
+        return page
+
+    def get_model_default_page(self, model: Type[Model]):
+        return self._lookup_model_page('default', self._models_default_pages, model)
 
     def get_models_default_pages(self, *models: Model):
         return [self.get_model_default_page(m) for m in models]
 
     def get_model_lcrud_page(self, model: Type[Model]):
-        try:
-            return self._models_lcrud_pages[model]
-        except KeyError:
-            return None
+        return self._lookup_model_page('lcrud', self._models_lcrud_pages, model)
 
     def get_models_lcrud_pages(self, *models: Model):
         return [self.get_model_lcrud_page(m) for m in models]
 
+    def get_model_autocomplete_page(self, model: Type[Model]):
+        lcrud = self.get_model_lcrud_page(model)
+        return getattr(lcrud, 'autocomplete', None)
+
+    @property
+    def menus(self) -> Mapping[str, MenuEntry]:
+        """ Read-only view of the menus """
+        return self._menus_view
+
+    def _invalidate(self):
+        """ Drop everything derived from the registered pages, after they changed """
+        self._version += 1
+        self._pages_view = None
+        self._models_lookup_cache.clear()
+        self._route_urls.clear()
+        self._menus_signature = None
+        self._menus_permissions = None
+
+    # Menus rendering
+    @property
+    def menus_signature(self) -> str:
+        """ Signature of the menus structure, changing when pages are added to menus """
+        if self._menus_signature is None:
+            structure = [(name, [(p.route_name, str(p.title)) for p in menu.pages]) for name, menu in self._menus.items()]
+            self._menus_signature = hashlib.md5(repr(structure).encode()).hexdigest()
+        return self._menus_signature
+
     @property
-    def menus(self) -> Dict[str, MenuEntry]:
-        # return {k: [p for p in self._menus[k]] for k  in self._menus.keys()}
-        return self._menus
+    def menus_permissions(self) -> Set[str]:
+        """ All the permissions required by the pages in the menus """
+        if self._menus_permissions is None:
+            self._menus_permissions = {perm for menu in self._menus.values() for p in menu.pages
+                                       for perm in p.permissions}
+        return self._menus_permissions
+
+    def render_menus(self, user) -> str:
+        """ Sidebar menus html for user, showing only the permitted pages.
+
+        The fragment is cached per (menus structure, user permissions signature, language), so it is rendered once
+        for all the users sharing the same relevant permissions and re-rendered when the menus change.
+        """
+        signature = permissions_signature(user, self.menus_permissions)
+        key = f'condor:menus:{self.menus_signature}:{signature}:{get_language()}:{get_script_prefix()}'
+        html = cache.get(key)
+        if html is None:
+            user_permissions = user.get_all_permissions() if self.menus_permissions else set()
+            permitted = (lambda p: True) if signature == 'superuser' else (lambda p: p.is_permitted(user_permissions))
+            menus = [(name, [(p, self.route_url(p.route_name)) for p in menu.pages if permitted(p)])
+                     for name, menu in self._menus.items()]
+            html = render_to_string('sidebar_menus.html', {'navigator': self, 'menus': menus})
+            cache.set(key, html, self.menu_cache_timeout)
+        return mark_safe(html)
 
     def __add_page_to_menus(self, page: CondorPage, menus: Union[str, Iterable[str]]):
         menus = [menus] if isinstance(menus, str) else menus
@@ -106,8 +233,12 @@ class CondorNavigator(metaclass=Singleton):
         :param menus: add the current pages to a set of menus defined by this parameter.
         :return: self
         """
-        if page not in self._pages:
-            self._pages.append(page)
+        registered = self._pages.get(page.route_name)
+        if registered is not page:
+            if registered is not None:
+                warnings.warn(f'A different page with route name {page.route_name} is already registered, '
+                              f'it is replaced.', RuntimeWarning, stacklevel=3)
+            self._pages[page.route_name] = page
             page._registered_navigator = self
         if isinstance(page, CondorModelPage):
             if model_default_page:
@@ -124,40 +255,78 @@ class CondorNavigator(metaclass=Singleton):
 
     def add_page(self, page: CondorPage, model_default_page=False, menus: Union[str, Iterable[str]]=None):
         assert not isinstance(page, ListCRUDPage), 'Please use register_model to add LCRUDPage related to a Model.'
-        return self.__add_page(page, model_default_page, menus)
+        self.__add_page(page, model_default_page, menus)
+        self._invalidate()
+        return self
 
     def add_pages(self, *pages: CondorPage, models_index_pages=False, menus: Union[str, Iterable[str]] = None):
         for p in pages:
-            self.add_page(p, model_default_page=models_index_pages, menus=menus)
+            assert not isinstance(p, ListCRUDPage), 'Please use register_model to add LCRUDPage related to a Model.'
+            self.__add_page(p, model_default_page=models_index_pages, menus=menus)
+        self._invalidate()
         return self
 
     def register_model(self, model, name=None, list_paginated_by=30, fields=None, form_class=None,
                        model_default_page=True, lcrud_page_type: Type[ListCRUDPage]=ListCRUDPage,
-                       lcrud_page_kwargs=None, menus: Union[str, Iterable[str]]=None):
+                       lcrud_page_kwargs=None, menus: Union[str, Iterable[str]]=None, pagination=OFFSET,
+                       searchable_fields=None):
         """ Register a model adding the corresponding lcrud pages """
-        lcrud = self.get_model_lcrud_page(model)
+        self.__register_model(model, name, list_paginated_by, fields, form_class, model_default_page,
+                              lcrud_page_type, lcrud_page_kwargs, menus, pagination, searchable_fields)
+        self._invalidate()
+        return self
+
+    def __register_model(self, model, name, list_paginated_by, fields, form_class, model_default_page,
+                         lcrud_page_type, lcrud_page_kwargs, menus, pagination, searchable_fields):
+        start = time.perf_counter()
+        lcrud = self._models_lcrud_pages.get(model)
         if lcrud is None:
             # We create a new LCRUDPage related to the model only if it does not already exists
-            if lcrud_page_kwargs:
-                lcrud_page_kwargs = {}
+            # lcrud_page_kwargs may also set pagination or searchable_fields, overriding the explicit arguments
+            lcrud_page_kwargs = {'pagination': pagination, 'searchable_fields': searchable_fields,
+                                 **(lcrud_page_kwargs or {})}
             lcrud = lcrud_page_type(model=model, page_name=name, list_paginated_by=list_paginated_by,
-                                    form_fields=fields, form_class=form_class, kwargs=lcrud_page_kwargs)
+                                    form_fields=fields, form_class=form_class, **lcrud_page_kwargs)
 
             self.__add_pages(*lcrud.pages)
             self._models_lcrud_pages[model] = lcrud
         self.__add_page(lcrud, model_default_page, menus)
-        return self
+        self._registration_timings[model] = self._registration_timings.get(model, 0) + time.perf_counter() - start
 
 
     def register_models(self, *models, list_paginated_by=30, models_default_page=True,
-                        menus: Union[str, Iterable[str]] = None):
-        """ Register a list of models adding the corresponding lcrud pages """
+                        menus: Union[str, Iterable[str]] = None, pagination=OFFSET):
+        """ Register a list of models adding the corresponding lcrud pages, invalidating the caches once """
         for model in models:
-            self.register_model(model, list_paginated_by=list_paginated_by, model_default_page=models_default_page, menus=menus)
+            self.__register_model(model, None, list_paginated_by, None, None, models_default_page, ListCRUDPage,
+                                  None, menus, pagination, None)
+        self._invalidate()
         return self
 
     @property
     def urls(self):
-        return [path for page in self.pages for path in page.paths]
+        start = time.perf_counter()
+        urls = [path for page in self.pages for path in page.paths]
+        self._urls_timing = time.perf_counter() - start
+        logger.debug(self.registration_report())
+        return urls
+
+    def response_cache_stats(self) -> Dict[str, dict]:
+        """ Hits and misses (in this process) of the response cache of every page caching its responses """
+        return {p.route_name: p.response_cache.stats for p in self.pages if p.response_cache is not None}
+
+    def registration_timings(self) -> List[Tuple[str, float]]:
+        """ (model label, seconds) spent registering every model, slowest first """
+        timings = [(model._meta.label, t) for model, t in self._registration_timings.items()]
+        return sorted(timings, key=lambda t: t[1], reverse=True)
+
+    def registration_report(self, limit=20) -> str:
+        """ Human readable startup timing report of the models registration and the urls construction """
+        timings = self.registration_timings()
+        lines = [f'Condor navigator: {len(timings)} models registered in {sum(t for _, t in timings) * 1000:.1f} ms']
+        if self._urls_timing is not None:
+            lines.append(f'  urls of {len(self._pages)} pages built in {self._urls_timing * 1000:.1f} ms')
+        lines += [f'  {label}: {t * 1000:.2f} ms' for label, t in timings[:limit]]
+        return '\n'.join(lines)
 
 
@@ -1,22 +1,33 @@
 from abc import ABC, abstractmethod
-from typing import Type, Dict
+from operator import attrgetter
+from typing import Type, Dict, Callable, Optional, List
 
-from django.contrib.auth.decorators import login_required
+from asgiref.sync import markcoroutinefunction, sync_to_async
+from django.contrib.auth.decorators import login_required, permission_required
 from django.db.models import Model, ForeignKey, ManyToManyField
 from django.db.models.fields.related_descriptors import ReverseManyToOneDescriptor, ManyToManyDescriptor
 from django.urls import path
 from django.views import View
 from django.views.generic.base import ContextMixin
+from condor_navigator.cache import ResponseCache, cache_responses, ConditionalGet, conditional_responses
+from condor_navigator.instrumentation import instrument
 from condor_navigator.utils import _value_or_default
 
 
 
 class CondorPage(ABC):
-    def __init__(self, name, title=None, login_required=True):
+    # True for pages with an async view (see is_async)
+    supports_async = False
+
+    def __init__(self, name, title=None, login_required=True, permissions=None, async_view=None):
         self._name = name
         self._title = title if title is not None else name
         self._registered_navigator = None
         self._login_required = login_required
+        self._permissions = tuple(permissions) if permissions else tuple()
+        self._async_view = async_view
+        self._instrumented = None
+        self._query_budget = None
         # self._route = f'{self.name}/' if route is None else route
 
 
@@ -24,6 +35,64 @@ class CondorPage(ABC):
     def login_required(self):
         return self._login_required
 
+    # Permissions
+    @property
+    def permissions(self):
+        """ Permissions ('app_label.codename') required to access the page """
+        return self._permissions
+
+    @permissions.setter
+    def permissions(self, value):
+        self._permissions = tuple(value) if value else tuple()
+
+    def is_permitted(self, user_permissions) -> bool:
+        """ True if the set of user_permissions grants access to the page """
+        return all(p in user_permissions for p in self._permissions)
+
+    @property
+    def response_cache(self) -> Optional[ResponseCache]:
+        """ Cache of the rendered responses of the page, None if responses are not cached """
+        return None
+
+    @property
+    def conditional_get(self) -> Optional[ConditionalGet]:
+        """ Validators of the responses of the page, None if the page does not answer conditional requests """
+        return None
+
+    @property
+    def is_async(self) -> bool:
+        """ True if the page is served by its async view: set per page with async_view, otherwise following the
+        async_views option of the navigator """
+        if not self.supports_async:
+            return False
+        if self._async_view is not None:
+            return self._async_view
+        return self.navigator is not None and self.navigator.async_views
+
+    @property
+    def instrumented(self) -> Optional[bool]:
+        """ Per page instrumentation switch, None to follow the instrumentation option of the navigator """
+        return self._instrumented
+
+    @instrumented.setter
+    def instrumented(self, value: Optional[bool]):
+        self._instrumented = value
+
+    @property
+    def query_budget(self) -> Optional[int]:
+        """ Maximum number of queries of a request to the page, checked by testing.assert_query_budgets """
+        return self._query_budget
+
+    @query_budget.setter
+    def query_budget(self, value: Optional[int]):
+        self._query_budget = value
+
+    @property
+    def is_instrumented(self) -> bool:
+        if self._instrumented is not None:
+            return self._instrumented
+        return self.navigator is not None and self.navigator.instrumentation
+
     def _add_condor_context(self, context: Dict):
         context['navigator'] = self.navigator
         context['pages'] = self
@@ -41,8 +110,17 @@ class CondorPage(ABC):
     def _get_view(self, *args, **kwargs) -> Type[View]:
         pass
 
-    def get_view(self, *args, **kwargs) -> Type[View]:
-        view = self._get_view(*args, **kwargs).as_view()
+    def get_view(self, *args, **kwargs) -> Callable:
+        """ View function of the page. The view class is built by _get_view on the first request.
+        Async pages get a coroutine view function, wrapped by async-aware decorators. """
+        view = AsyncLazyView(self, *args, **kwargs) if self.is_async else LazyView(self, *args, **kwargs)
+        if self.response_cache is not None:
+            view = cache_responses(view, self)
+        if self.conditional_get is not None and self.conditional_get.enabled:
+            view = conditional_responses(view, self)
+        view = instrument(view, self)
+        if self.permissions:
+            view = permission_required(self.permissions, login_url=self.navigator.not_logged_url)(view)
         if self.login_required:
             view = login_required(view, login_url=self.navigator.not_logged_url)
         return view
@@ -78,6 +156,11 @@ class CondorPage(ABC):
     def route(self):
         return f'{self.name}/'
 
+    @property
+    def route_kwargs(self):
+        """ Names of the kwargs accepted by the route """
+        return tuple()
+
     @property
     def default_path(self, *args, **kwargs):
         return path(self.route, self.get_view(*args, **kwargs), name=self.route_name)
@@ -87,6 +170,37 @@ class CondorPage(ABC):
         return [self.default_path]
 
 
+class LazyView:
+    """ View function building the class based view of a page (and its forms) on first dispatch """
+    def __init__(self, page: CondorPage, *args, **kwargs):
+        self._page = page
+        self._args = args
+        self._kwargs = kwargs
+        self._view = None
+
+    @property
+    def view(self) -> Callable:
+        if self._view is None:
+            self._view = self._page._get_view(*self._args, **self._kwargs).as_view()
+        return self._view
+
+    def __call__(self, request, *args, **kwargs):
+        return self.view(request, *args, **kwargs)
+
+
+class AsyncLazyView(LazyView):
+    """ LazyView of an async class based view, marked as coroutine function for the async request handling """
+    def __init__(self, page: CondorPage, *args, **kwargs):
+        super().__init__(page, *args, **kwargs)
+        markcoroutinefunction(self)
+
+    async def __call__(self, request, *args, **kwargs):
+        if self._view is None:
+            # Building the forms of the view may query the database (e.g. sizes of the related tables)
+            await sync_to_async(attrgetter('view'))(self)
+        return await self.view(request, *args, **kwargs)
+
+
 class CondorModelPage(CondorPage):
     def __init__(self, model: Type[Model], page_name=None):
         self._model = model
@@ -119,6 +233,17 @@ class CondorModelPage(CondorPage):
     def model_key_names(self):
         return self.model_fk_names() + ['pk']
 
+    @property
+    def filters_path(self):
+        """ Regex of the optional /<key>-<id> filter segments of the list urls """
+        keys = [k for k in self.model_key_names()]
+        filters_path_str = [f"(?:/{k}-(?P<{k}>\d+))?" for k in keys]
+        return ''.join(filters_path_str)
+
+    def key_filter_kwargs(self, kwargs):
+        """ Filters selected by the url kwargs """
+        return {key: kwargs[key] for key in self.model_key_names() if key in kwargs.keys()}
+
     def model_reverse_fks(self):
         reverse_fks = []
         for k, v in self.model.__dict__.items():
@@ -148,7 +273,26 @@ class CondorModelPage(CondorPage):
 
     def model_fields_map(self):
         fields = self.model._meta.get_fields()
-        return {f.code: f for f in fields}
+        return {f.name: f for f in fields}
+
+    def model_select_related_names(self, field_names):
+        """ Names of the forward FK (and one-to-one) fields among field_names, suitable for select_related """
+        return [f.name for f in self.model._meta.get_fields() if f.name in field_names and isinstance(f, ForeignKey)]
+
+    def model_prefetch_related_names(self, field_names):
+        """ Names of the forward M2M fields among field_names, suitable for prefetch_related """
+        return [f.name for f in self.model._meta.get_fields()
+                if f.name in field_names and isinstance(f, ManyToManyField)]
+
+    def model_dependencies(self) -> List[Type[Model]]:
+        """ Models whose data is shown by the page: the model and the targets of its FKs and M2Ms """
+        related = [f.related_model for f in self.model._meta.get_fields()
+                   if f.is_relation and not f.auto_created and (f.many_to_one or f.one_to_one or f.many_to_many)]
+        return [self.model] + [m for m in related if m is not None]
+
+    def validator_queryset(self, request, kwargs):
+        """ Rows shown by the page at request, whose last modified field is used as validator """
+        return None
 
     def model_object_to_dict(self, model_object):
         object_fields = {}
@@ -0,0 +1,223 @@
+import json
+from typing import Type, Dict, Optional
+
+from bootstrap_modal_forms.mixins import CreateUpdateAjaxMixin
+from django import forms
+from django.core.exceptions import PermissionDenied
+from django.db.models import Model
+from django.http import JsonResponse, QueryDict, HttpResponse
+from django.urls import re_path
+from django.views import View
+
+from condor_navigator.cache import ConditionalGet
+from condor_navigator.page import CondorModelPage
+from condor_navigator.pages.export import ExportJSONEncoder
+from condor_navigator.pagination import KEYSET, KeysetPaginator, InvalidCursor, CondorPaginator
+
+
+def api_response(data, status=200) -> JsonResponse:
+    return JsonResponse(data, status=status, encoder=ExportJSONEncoder, safe=False)
+
+
+def api_error(message, status, **kwargs) -> JsonResponse:
+    return api_response({'error': message, **kwargs}, status=status)
+
+
+def request_data(request):
+    """ Submitted data of request: a JSON object, or form encoded (also for PUT and PATCH) """
+    if request.content_type == 'application/json':
+        data = json.loads(request.body or b'{}')
+        if not isinstance(data, dict):
+            raise ValueError('Expected a JSON object')
+        return data
+    if request.method == 'POST':
+        return request.POST
+    return QueryDict(request.body)
+
+
+class ApiPageMixin:
+    """ JSON endpoints of a ListCRUDPage: data of the list page, validation and saving with its form """
+    _list_page: 'ListCRUDPage'
+
+    @property
+    def list_page(self) -> 'ListCRUDPage':
+        return self._list_page
+
+    @property
+    def form(self) -> Type[forms.ModelForm]:
+        return self.list_page.create.form
+
+    def check_permissions(self, request, page: CondorModelPage):
+        """ Writes require the permissions of the corresponding html page (create, update or delete) """
+        if page.permissions and not request.user.has_perms(page.permissions):
+            raise PermissionDenied
+
+    def object_data(self, obj: Model) -> Dict:
+        """ Values of the form fields of obj as accepted by the form: pks for FKs, lists of pks for M2Ms """
+        data = {'pk': obj.pk}
+        for name, _, many_to_many in self.list_page.read.read_plan[0]:
+            if name not in self.form.base_fields:
+                continue
+            if many_to_many:
+                data[name] = [related.pk for related in getattr(obj, name).all()]
+            else:
+                data[name] = self.model._meta.get_field(name).value_from_object(obj)
+        return data
+
+    def save_form(self, data, instance: Model = None):
+        """ Validate data with the page form and save it, returns (object, None) or (None, errors) """
+        form = self.form(data=data, instance=instance)
+        if not form.is_valid():
+            return None, form.errors.get_json_data()
+        if isinstance(form, CreateUpdateAjaxMixin):
+            # Bypass the ajax-dependent save of bootstrap_modal_forms, which needs the request
+            return forms.ModelForm.save(form), None
+        return form.save(), None
+
+
+class ApiListPage(ApiPageMixin, CondorModelPage):
+    """ JSON list endpoint of a ListCRUDPage, with its url filters, search and pagination.
+
+    GET returns the rows of a page as arrays, in the order of the columns header (the column plan of the list),
+    no template is rendered. POST creates an object validated by the form of the page.
+    """
+    def __init__(self, list_page: 'ListCRUDPage', page_name=None):
+        super().__init__(list_page.model, page_name)
+        self._list_page = list_page
+
+    @property
+    def conditional_get(self) -> Optional[ConditionalGet]:
+        return self.list_page.conditional_get
+
+    def validator_queryset(self, request, kwargs):
+        return self.list_page.validator_queryset(request, kwargs)
+
+    @property
+    def route(self):
+        return f'api/{self.name}{self.list_page.filters_path}'
+
+    @property
+    def route_kwargs(self):
+        return self.list_page.route_kwargs
+
+    @property
+    def route_name(self):
+        return super().route_name + '_api_list'
+
+    @property
+    def paths(self, *args, **kwargs):
+        return [re_path(f'^{self.route}$', self.get_view(*args, **kwargs), name=self.route_name)]
+
+    @property
+    def columns(self):
+        pk_name = self.model._meta.pk.name
+        return tuple(c for c in self.list_page.column_plan.columns if c.name != pk_name)
+
+    def paginate(self, request, queryset):
+        """ (rows, pagination data) of the page of queryset selected by request """
+        list_page = self.list_page
+        if list_page.pagination == KEYSET:
+            page = KeysetPaginator(queryset, list_page.paginated_by, list_page.keyset_ordering).page(
+                after=request.GET.get('after'), before=request.GET.get('before'))
+            return page.object_list, {'next': page.next_cursor, 'previous': page.previous_cursor}
+        paginator = CondorPaginator(queryset, list_page.paginated_by, count_strategy=list_page.count_strategy)
+        page = paginator.get_page(request.GET.get('page'))
+        return page.object_list, {
+            'number': page.number, 'num_pages': paginator.num_pages, 'count': paginator.count,
+            'count_is_exact': paginator.count_is_exact,
+            'next': page.next_page_number() if page.has_next() else None,
+            'previous': page.previous_page_number() if page.has_previous() else None}
+
+    def _get_view(self, *args, **kwargs) -> Type[View]:
+        class CondorApiListView(View):
+            def get(iself, request, **kwargs):
+                queryset = self.list_page.list_queryset(self.list_page.key_filter_kwargs(kwargs), request.GET.get('q'))
+                try:
+                    rows, pagination = self.paginate(request, queryset)
+                except InvalidCursor:
+                    return api_error('Invalid page cursor', 404)
+                columns = self.columns
+                return api_response({'columns': ['pk'] + [c.name for c in columns],
+                                     'rows': [[obj.pk] + [c.data(obj) for c in columns] for obj in rows],
+                                     'pagination': pagination})
+
+            def post(iself, request, **kwargs):
+                self.check_permissions(request, self.list_page.create)
+                try:
+                    data = request_data(request)
+                except ValueError as e:
+                    return api_error(str(e), 400)
+                obj, errors = self.save_form(data)
+                if errors is not None:
+                    return api_error('Invalid data', 400, errors=errors)
+                return api_response(self.object_data(obj), status=201)
+
+        return CondorApiListView
+
+
+class ApiObjectPage(ApiPageMixin, CondorModelPage):
+    """ JSON endpoint of an object of a ListCRUDPage: GET reads, PUT/PATCH update (validated by the form of the
+    page, PATCH keeps the fields not submitted), DELETE deletes it """
+    def __init__(self, list_page: 'ListCRUDPage', page_name=None):
+        super().__init__(list_page.model, page_name)
+        self._list_page = list_page
+
+    @property
+    def conditional_get(self) -> Optional[ConditionalGet]:
+        return self.list_page.read.conditional_get
+
+    def validator_queryset(self, request, kwargs):
+        return self.list_page.read.validator_queryset(request, kwargs)
+
+    @property
+    def route(self):
+        return f'api/{self.name}/<int:pk>'
+
+    @property
+    def route_kwargs(self):
+        return 'pk',
+
+    @property
+    def route_name(self):
+        return super().route_name + '_api_object'
+
+    def _get_view(self, *args, **kwargs) -> Type[View]:
+        class CondorApiObjectView(View):
+            def dispatch(iself, request, *args, **kwargs):
+                iself.object = self.list_page.read.read_queryset().filter(pk=kwargs['pk']).first()
+                if iself.object is None:
+                    return api_error('Not found', 404)
+                return super().dispatch(request, *args, **kwargs)
+
+            def get(iself, request, **kwargs):
+                return api_response(self.object_data(iself.object))
+
+            def put(iself, request, **kwargs):
+                return iself.update(request, partial=False)
+
+            def patch(iself, request, **kwargs):
+                return iself.update(request, partial=True)
+
+            def update(iself, request, partial):
+                self.check_permissions(request, self.list_page.update)
+                try:
+                    data = request_data(request)
+                except ValueError as e:
+                    return api_error(str(e), 400)
+                if partial:
+                    current = self.object_data(iself.object)
+                    for key in data:
+                        many = isinstance(data, QueryDict) and isinstance(current.get(key), list)
+                        current[key] = data.getlist(key) if many else data[key]
+                    data = current
+                obj, errors = self.save_form(data, instance=iself.object)
+                if errors is not None:
+                    return api_error('Invalid data', 400, errors=errors)
+                return api_response(self.object_data(obj))
+
+            def delete(iself, request, **kwargs):
+                self.check_permissions(request, self.list_page.delete)
+                iself.object.delete()
+                return HttpResponse(status=204)
+
+        return CondorApiObjectView
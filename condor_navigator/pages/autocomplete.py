@@ -0,0 +1,78 @@
+import operator
+from functools import reduce
+from typing import Type, Tuple
+
+from django.db.models import Q, CharField, QuerySet
+from django.http import JsonResponse
+from django.views import View
+
+from condor_navigator.page import CondorModelPage
+
+
+class AutocompletePage(CondorModelPage):
+    """ Select2 JSON endpoint returning the rows of a model matching a term, one page at a time.
+
+    Rows are looked up in the full-text index of the list page when it is ready, otherwise with istartswith on the
+    searchable fields (or on the first char field of the model), so that an index on those fields can be used.
+    No COUNT(*) is executed: a page is fetched one row longer to know if more rows exist.
+    """
+    def __init__(self, list_page: 'ListPage', page_name=None, paginated_by=25):
+        super().__init__(list_page.model, page_name)
+        self._list_page = list_page
+        self._paginated_by = paginated_by
+
+    @property
+    def list_page(self) -> 'ListPage':
+        return self._list_page
+
+    @property
+    def paginated_by(self):
+        return self._paginated_by
+
+    @property
+    def lookup_fields(self) -> Tuple[str, ...]:
+        """ Fields matched by the term: the searchable fields of the list page or the first char field """
+        if self.list_page.searchable_fields:
+            return self.list_page.searchable_fields
+        return tuple(f.name for f in self.model._meta.concrete_fields if isinstance(f, CharField))[:1]
+
+    @property
+    def route(self):
+        return f'{self.name}/autocomplete'
+
+    @property
+    def route_name(self):
+        return super().route_name + '_autocomplete'
+
+    def lookup_queryset(self, term: str) -> QuerySet:
+        queryset = self.model._default_manager.all()
+        term = term.strip()
+        index = self.list_page.search_index
+        if term and index is not None and index.is_ready(queryset.db):
+            return index.search(queryset, term)
+        fields = self.lookup_fields
+        ordering = (fields[0], 'pk') if fields else ('pk',)
+        if not term:
+            return queryset.order_by(*ordering)
+        if not fields:
+            return queryset.filter(pk=term) if term.isdigit() else queryset.none()
+        lookups = [Q(**{f'{f}__istartswith': term}) for f in fields]
+        return queryset.filter(reduce(operator.or_, lookups)).order_by(*ordering)
+
+    def result(self, obj):
+        return {'id': obj.pk, 'text': str(obj)}
+
+    def _get_view(self, *args, **kwargs) -> Type[View]:
+        class CondorAutocompleteView(View):
+            def get(iself, request, **kwargs):
+                try:
+                    page = max(int(request.GET.get('page', 1)), 1)
+                except ValueError:
+                    page = 1
+                bottom = (page - 1) * self.paginated_by
+                queryset = self.lookup_queryset(request.GET.get('term', ''))
+                rows = list(queryset[bottom:bottom + self.paginated_by + 1])
+                return JsonResponse({'results': [self.result(obj) for obj in rows[:self.paginated_by]],
+                                     'more': len(rows) > self.paginated_by})
+
+        return CondorAutocompleteView
@@ -0,0 +1,185 @@
+from typing import Type, Dict, Iterable, Callable, List, Tuple
+
+from django import forms
+from django.core.exceptions import ValidationError, PermissionDenied
+from django.db import transaction, router
+from django.db.models import QuerySet
+from django.http import HttpResponseBadRequest, HttpResponseRedirect
+from django.utils.http import url_has_allowed_host_and_scheme
+from django.views import View
+from django.views.generic import TemplateView
+
+from condor_navigator.cache import bump_model_version
+from condor_navigator.page import CondorModelPage
+
+
+class BulkAction:
+    """ Action run on the rows selected in a list, batch by batch, each batch in a transaction.
+
+    function(queryset, data) receives the queryset of a batch and the cleaned data of the action, and returns the
+    number of affected rows. Users need the permissions of the permission_page of the action to run it.
+    """
+    def __init__(self, name: str, label: str = None, function: Callable[[QuerySet, Dict], int] = None):
+        self.name = name
+        self.label = name.capitalize() if label is None else label
+        self._function = function
+
+    def get_form_class(self, page: 'BulkActionPage') -> Type[forms.Form]:
+        """ Form of the data needed by the action, shown in the preview """
+        return forms.Form
+
+    def permission_page(self, page: 'BulkActionPage') -> CondorModelPage:
+        """ Page of the list whose permissions are required to run the action: the update page by default """
+        return page.list_page.update
+
+    def run(self, queryset: QuerySet, data: Dict) -> int:
+        return self._function(queryset, data)
+
+
+class DeleteAction(BulkAction):
+    """ Delete the selected rows with QuerySet.delete() """
+    def __init__(self, name='delete', label='Delete'):
+        super().__init__(name, label)
+
+    def permission_page(self, page: 'BulkActionPage') -> CondorModelPage:
+        return page.list_page.delete
+
+    def run(self, queryset: QuerySet, data: Dict) -> int:
+        _, deleted = queryset.delete()
+        return deleted.get(queryset.model._meta.label, 0)
+
+
+class UpdateAction(BulkAction):
+    """ Set a field of the selected rows with QuerySet.update(), the value is validated by the page form field """
+    def __init__(self, name='update', label='Update'):
+        super().__init__(name, label)
+
+    def get_form_class(self, page: 'BulkActionPage') -> Type[forms.Form]:
+        form_fields = page.list_page.create.form.base_fields
+        choices = [(name, page.model._meta.get_field(name).verbose_name) for name in page.updatable_fields()]
+
+        class UpdateActionForm(forms.Form):
+            field = forms.ChoiceField(choices=choices)
+            value = forms.CharField(required=False)
+
+            def clean(iself):
+                cleaned_data = super().clean()
+                if 'field' in cleaned_data:
+                    try:
+                        cleaned_data['value'] = form_fields[cleaned_data['field']].clean(cleaned_data.get('value'))
+                    except ValidationError as e:
+                        iself.add_error('value', e)
+                return cleaned_data
+
+        return UpdateActionForm
+
+    def run(self, queryset: QuerySet, data: Dict) -> int:
+        return queryset.update(**{data['field']: data['value']})
+
+
+class BulkActionPage(CondorModelPage):
+    """ Runs an action on the rows selected in a ListCRUDPage.
+
+    Selected rows are sent with GET to show a preview (number of rows and data of the action), confirmed with POST.
+    Rows are processed in batches of batch_size primary keys, each batch in a transaction. Versions (and the
+    full-text index) of the model are updated, since QuerySet.update() sends no signals.
+    """
+    def __init__(self, list_page: 'ListCRUDPage', page_name=None, actions: Iterable[BulkAction] = None,
+                 batch_size=500, template_name=None):
+        super().__init__(list_page.model, page_name)
+        self._list_page = list_page
+        self._actions: Dict[str, BulkAction] = {}
+        for action in (DeleteAction(), UpdateAction()) + tuple(actions if actions is not None else ()):
+            self._actions[action.name] = action
+        self._batch_size = batch_size
+        self._template_name = "pages/bulk.html" if template_name is None else template_name
+
+    @property
+    def list_page(self) -> 'ListCRUDPage':
+        return self._list_page
+
+    @property
+    def actions(self) -> Tuple[BulkAction, ...]:
+        return tuple(self._actions.values())
+
+    def add_action(self, action: BulkAction):
+        self._actions[action.name] = action
+
+    def get_action(self, name) -> BulkAction:
+        return self._actions.get(name)
+
+    def updatable_fields(self) -> List[str]:
+        form_fields = self.list_page.create.form.base_fields
+        return [f.name for f in self.model._meta.concrete_fields
+                if f.editable and not f.primary_key and f.name in form_fields]
+
+    @property
+    def route(self):
+        return f'{self.name}/bulk'
+
+    @property
+    def route_name(self):
+        return super().route_name + '_bulk'
+
+    def check_permissions(self, request, action: BulkAction):
+        """ Raise PermissionDenied if the user of request cannot run action """
+        permissions = action.permission_page(self).permissions
+        if permissions and not request.user.has_perms(permissions):
+            raise PermissionDenied
+
+    def selected_queryset(self, pks) -> QuerySet:
+        return self.model._default_manager.filter(pk__in=pks)
+
+    def run(self, action: BulkAction, pks: List, data: Dict) -> int:
+        """ Run action on the rows with pks, returns the number of affected rows """
+        count = 0
+        using = router.db_for_write(self.model)
+        for i in range(0, len(pks), self._batch_size):
+            batch = pks[i:i + self._batch_size]
+            with transaction.atomic(using=using):
+                count += action.run(self.selected_queryset(batch).using(using), data)
+            search_index = self.list_page.search_index
+            if search_index is not None:
+                search_index.index_objects(self.selected_queryset(batch).using(using), using)
+        bump_model_version(self.model)
+        return count
+
+    def _get_view(self, *args, **kwargs) -> Type[View]:
+        CondorViewMixin = self.get_condor_view_mixin()
+
+        class CondorBulkActionView(CondorViewMixin, TemplateView):
+            template_name = self._template_name
+
+            def get_next_url(iself):
+                next_url = iself.request.GET.get('next') or iself.request.POST.get('next')
+                if next_url and url_has_allowed_host_and_scheme(next_url, allowed_hosts={iself.request.get_host()}):
+                    return next_url
+                return self.navigator.route_url(self.list_page.route_name)
+
+            def dispatch(iself, request, *args, **kwargs):
+                data = request.POST if request.method == 'POST' else request.GET
+                iself.action = self.get_action(data.get('action'))
+                if iself.action is None:
+                    return HttpResponseBadRequest('Unknown bulk action')
+                self.check_permissions(request, iself.action)
+                try:
+                    iself.pks = [self.model._meta.pk.to_python(pk) for pk in data.getlist('pks') if pk]
+                except ValidationError:
+                    return HttpResponseBadRequest('Invalid selection')
+                return super().dispatch(request, *args, **kwargs)
+
+            def get_context_data(iself, **kwargs):
+                context = super().get_context_data(**kwargs)
+                context.update(page=self, action=iself.action, pks=iself.pks, next_url=iself.get_next_url(),
+                               count=self.selected_queryset(iself.pks).count())
+                context.setdefault('form', iself.action.get_form_class(self)())
+                return context
+
+            def post(iself, request, *args, **kwargs):
+                form = iself.action.get_form_class(self)(request.POST)
+                if not form.is_valid():
+                    return iself.render_to_response(iself.get_context_data(form=form))
+                self.run(iself.action, iself.pks, form.cleaned_data)
+                return HttpResponseRedirect(iself.get_next_url())
+
+        return CondorBulkActionView
@@ -1,16 +1,34 @@
 from abc import ABC
-from typing import Type
+from operator import attrgetter
+from typing import Type, Optional
 
+from asgiref.sync import sync_to_async
 from bootstrap_modal_forms.generic import BSModalCreateView, BSModalReadView, BSModalUpdateView, BSModalDeleteView
 from bootstrap_modal_forms.mixins import CreateUpdateAjaxMixin
-from django.db.models import Model, ManyToManyField, QuerySet
+from django.db.models import Model, ManyToManyField, QuerySet, ManyToOneRel, ForeignKey, Subquery, OuterRef, Count, \
+    TextField, JSONField, BinaryField
+from django.db.models.functions import Coalesce
+from django.core.paginator import InvalidPage
+from django.http import Http404
+from django.db.models.fields.reverse_related import ManyToManyRel
 from django.urls import reverse_lazy, re_path
+from django.utils.http import urlencode
 from django.views import View
 from django.views.generic import ListView
 from django_addanother.views import CreatePopupMixin, UpdatePopupMixin
 
+from condor_navigator.cache import ResponseCache, ConditionalGet, VERSION
+from condor_navigator.columns import Column, ColumnPlan, RelatedColumn, PLAIN, FK_LINK, M2M_JOIN, ID_LINK
 from condor_navigator.forms import condor_bsmf_form
 from condor_navigator.page import CondorModelPage
+from condor_navigator.pages.api import ApiListPage, ApiObjectPage
+from condor_navigator.pages.autocomplete import AutocompletePage
+from condor_navigator.pages.bulk import BulkActionPage
+from condor_navigator.pages.export import ExportPage
+from condor_navigator.pages.imports import ImportPage
+from condor_navigator.search import register_search_index
+from condor_navigator.pagination import OFFSET, KEYSET, PAGINATION_MODES, KeysetPaginator, InvalidCursor, \
+    normalize_keyset_ordering, EXACT, CondorPaginator, get_count_strategy
 
 
 class CondorModelFormPage(CondorModelPage, ABC):
@@ -25,11 +43,14 @@ class CondorModelFormPage(CondorModelPage, ABC):
         self._form = form_class
 
     def set_default_form(self, form_fields=None):
-        fields = "__all__" if form_fields is None else form_fields
-        self._form = condor_bsmf_form(self._model, condor_fields=fields)
+        """ Use the condor form of the model, built on first access """
+        self._form = None
+        self._form_fields = "__all__" if form_fields is None else form_fields
 
     @property
     def form(self):
+        if self._form is None:
+            self._form = condor_bsmf_form(self._model, condor_fields=self._form_fields)
         return self._form
 
 class CreatePage(CondorModelFormPage):
@@ -67,15 +88,73 @@ class CreatePage(CondorModelFormPage):
 
 
 class ReadPage(CondorModelFormPage):
+    supports_async = True
+
     def __init__(self, model: Type[Model], page_name=None,
-                 form_fields=None, form_class=None, template_name=None):
+                 form_fields=None, form_class=None, template_name=None, cache_timeout=None,
+                 conditional_get=False, last_modified_field=None, validators_fallback=VERSION, async_view=None):
         super().__init__(model, page_name, form_fields, form_class)
+        self._async_view = async_view
         self._template_name = "pages/read.html" if template_name is None else template_name
+        self._response_cache = ResponseCache(self.model_dependencies(), cache_timeout) if cache_timeout else None
+        self._conditional_get = ConditionalGet(model, self.model_dependencies(), last_modified_field,
+                                               validators_fallback) if conditional_get else None
+        self._read_plan = None
+
+    @property
+    def response_cache(self) -> Optional[ResponseCache]:
+        """ Cache of the rendered read pages, opt-in with cache_timeout """
+        return self._response_cache
+
+    @property
+    def conditional_get(self) -> Optional[ConditionalGet]:
+        return self._conditional_get
+
+    def validator_queryset(self, request, kwargs):
+        return self.model._default_manager.filter(pk=kwargs['pk'])
+
+    # Query plan
+    def compile_read_plan(self):
+        """ Shown fields (name, verbose name, is M2M) and relations to join/prefetch, computed once per page """
+        fields = tuple((name, field.verbose_name, field.many_to_many)
+                       for name, field in self.model_forward_fields().items())
+        names = [name for name, _, _ in fields]
+        return fields, tuple(self.model_select_related_names(names)), tuple(self.model_prefetch_related_names(names))
+
+    @property
+    def read_plan(self):
+        if self._read_plan is None:
+            self._read_plan = self.compile_read_plan()
+        return self._read_plan
+
+    def read_queryset(self) -> QuerySet:
+        """ Queryset of the read object, joining its FKs and prefetching its M2Ms """
+        _, select_related, prefetch_related = self.read_plan
+        queryset = self.model._default_manager.all()
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        return queryset
+
+    def read_field_values(self, obj: Model):
+        """ {name: (verbose name, value)} of the shown fields of obj, M2M values joined in a string """
+        fields = {}
+        for name, verbose_name, many_to_many in self.read_plan[0]:
+            value = getattr(obj, name)
+            if many_to_many:
+                value = ", ".join(str(v) for v in value.all())
+            fields[name] = (verbose_name, value)
+        return fields
 
     @property
     def route(self):
         return f'{self.name}/<int:pk>/read'
 
+    @property
+    def route_kwargs(self):
+        return 'pk',
+
     @property
     def route_name(self):
         return super().route_name + '_read'
@@ -88,20 +167,29 @@ class ReadPage(CondorModelFormPage):
             template_name = self._template_name
             form_class = self.form  # .set_readonly(True)
 
+            def get_queryset(iself):
+                return self.read_queryset()
+
             def get_context_data(iself, **kwargs):
                 context = super().get_context_data(**kwargs)
-                fields = {}
-                fields_objects = self.model_forward_fields()
-                fields_values = self.model_object_to_dict(context['object'])
-                for fname, fvalue in fields_values.items():
-                    if isinstance(fvalue, QuerySet):
-                        fvalue = ", ".join(str(v) for v in fvalue)
-                    # fields[fields_objects[fname].verbose_name] = fvalue
-                    fields[fname] = (fields_objects[fname].verbose_name, fvalue)
-                context['fields'] = fields
+                context['fields'] = self.read_field_values(context['object'])
                 return context
 
-        return CondorReadView
+        if not self.is_async:
+            return CondorReadView
+
+        class CondorAsyncReadView(CondorReadView):
+            async def get(iself, request, *args, **kwargs):
+                try:
+                    iself.object = await self.read_queryset().aget(pk=kwargs['pk'])
+                except self.model.DoesNotExist:
+                    raise Http404(f'No {self.model._meta.verbose_name} found matching the query')
+                return await sync_to_async(iself.render_object)()
+
+            def render_object(iself):
+                return iself.render_to_response(iself.get_context_data(object=iself.object))
+
+        return CondorAsyncReadView
 
 
 class UpdatePage(CondorModelFormPage):
@@ -115,6 +203,10 @@ class UpdatePage(CondorModelFormPage):
     def route(self):
         return f'{self.name}/<int:pk>/update'
 
+    @property
+    def route_kwargs(self):
+        return 'pk',
+
     @property
     def route_name(self):
         return super().route_name + '_update'
@@ -144,6 +236,10 @@ class DeletePage(CondorModelFormPage):
     def route(self):
         return f'{self.name}/<int:pk>/delete'
 
+    @property
+    def route_kwargs(self):
+        return 'pk',
+
     @property
     def route_name(self):
         return super().route_name + '_delete'
@@ -164,13 +260,38 @@ class DeletePage(CondorModelFormPage):
 
 
 class ListPage(CondorModelPage):
+    supports_async = True
+
     def __init__(self, model: Type[Model], page_name=None, paginated_by=30, template_name=None,
-                 fields=None, excluded_fields=('id',)):
+                 fields=None, excluded_fields=('id',), select_related=None, prefetch_related=None,
+                 pagination=OFFSET, keyset_ordering=None, count_strategy=EXACT, count_cache_timeout=60,
+                 count_estimate_cap=1000, searchable_fields=None, related_counts=False, cache_timeout=None,
+                 conditional_get=False, last_modified_field=None, validators_fallback=VERSION, async_view=None,
+                 restrict_columns=True, related_deferred_fields=None):
         super().__init__(model, page_name)
+        self._async_view = async_view
+        assert pagination in PAGINATION_MODES, f'pagination must be one of {PAGINATION_MODES}'
         self._paginated_by = paginated_by
+        self._pagination = pagination
+        self._keyset_ordering = normalize_keyset_ordering(model, keyset_ordering) if pagination == KEYSET else None
+        self._count_strategy = get_count_strategy(count_strategy, timeout=count_cache_timeout, cap=count_estimate_cap)
+        self._count_strategy.watch(model)
+        self._searchable_fields = tuple(searchable_fields) if searchable_fields else tuple()
+        self._search_index = register_search_index(model, self._searchable_fields) if searchable_fields else None
+        self._related_counts = related_counts
+        self._related_columns = None
         self._template_name = "pages/list.html" if template_name is None else template_name
         self._fields = "__all__" if fields is None else fields
         self._excluded_fields = tuple() if excluded_fields is None else excluded_fields
+        self._select_related = select_related
+        self._prefetch_related = prefetch_related
+        self._restrict_columns = restrict_columns
+        self._related_deferred_fields = related_deferred_fields
+        self._column_plan = None
+        self._column_plan_version = None
+        self._response_cache = ResponseCache(self.model_dependencies(), cache_timeout) if cache_timeout else None
+        self._conditional_get = ConditionalGet(model, self.model_dependencies(), last_modified_field,
+                                               validators_fallback) if conditional_get else None
         self.title = self.title
 
     @property
@@ -181,22 +302,232 @@ class ListPage(CondorModelPage):
     def excluded_fields(self):
         return self._excluded_fields
 
+    @property
+    def paginated_by(self):
+        return self._paginated_by
+
+    @property
+    def pagination(self):
+        return self._pagination
+
+    @property
+    def keyset_ordering(self):
+        """ Unique ordering key used by keyset pagination (pk as tiebreaker) """
+        return self._keyset_ordering
+
+    @property
+    def count_strategy(self):
+        """ Strategy used to count the rows of offset paginated lists """
+        return self._count_strategy
+
+    @property
+    def searchable_fields(self):
+        return self._searchable_fields
+
+    @property
+    def search_index(self):
+        """ Full-text index over the searchable fields, None if the list is not searchable """
+        return self._search_index
+
+    def list_field_names(self):
+        """ Names of the model fields displayed as list columns, in model order """
+        names = []
+        for k, field in self.model_fields_map().items():
+            if self.fields != '__all__' and k not in self.fields:
+                continue
+            if k in self.excluded_fields:
+                continue
+            if isinstance(field, ManyToOneRel) or isinstance(field, ManyToManyRel):
+                continue
+            names.append(k)
+        return names
+
+    # Column plan
+    @property
+    def column_plan(self) -> ColumnPlan:
+        """ Column plan run by table_header/table_row, compiled on first use and when the registered pages change """
+        if self._column_plan is None or self._column_plan_version != self.navigator.version:
+            self._column_plan = self.compile_column_plan()
+            self._column_plan_version = self.navigator.version
+        return self._column_plan
+
+    def compile_column_plan(self) -> ColumnPlan:
+        fields_map = self.model_fields_map()
+        columns = []
+        for k in self.list_field_names():
+            field = fields_map[k]
+            column = dict(name=k, verbose_name=field.verbose_name, kind=PLAIN, accessor=attrgetter(k),
+                          urls=self.navigator.route_urls)
+            if k == 'id':
+                page = self.navigator.get_model_default_page(self.model)
+                if page is not None:
+                    column.update(kind=ID_LINK, link_template="<a href='{}'><u>{}</u></a>",
+                                  route_name=page.route_name, route_with_pk=isinstance(page, ListCRUDPage))
+            elif isinstance(field, ForeignKey):
+                page = self.navigator.get_model_default_page(field.related_model)
+                if isinstance(page, ListCRUDPage):
+                    column.update(kind=FK_LINK, link_template="<a class='bs-modal' data-form-url='{}' href='#'><u>{}</u></a>",
+                                  route_name=page.read.route_name, route_with_pk=True)
+                elif page is not None:
+                    column.update(kind=FK_LINK, link_template="<a href='{}'><u>{}</u></a>", route_name=page.route_name)
+                if page is not None:
+                    column.update(header_route_name=page.route_name)
+            elif isinstance(field, ManyToManyField):
+                column.update(kind=M2M_JOIN)
+            columns.append(Column(**column))
+        return ColumnPlan(columns)
+
+    @property
+    def related_columns(self):
+        """ Reverse FK columns, linking every row to the list of its related rows """
+        if self._related_columns is None:
+            self._related_columns = tuple(
+                RelatedColumn(fk.name, fk.model, f'condor_count_{fk.model._meta.model_name}_{fk.name}')
+                for fk in self.model_reverse_fks())
+        return self._related_columns
+
+    @property
+    def related_counts(self):
+        """ If True, list rows are annotated with the number of related rows of each reverse FK column """
+        return self._related_counts
+
+    def related_count_annotations(self):
+        """ Count of the related rows of every reverse FK column, as correlated subqueries (no join fan-out) """
+        annotations = {}
+        for column in self.related_columns:
+            fk = column.model._meta.get_field(column.fk_name)
+            related = column.model._default_manager.filter(**{column.fk_name: OuterRef(fk.target_field.attname)})
+            counts = related.order_by().values(column.fk_name).annotate(count=Count('pk')).values('count')
+            annotations[column.count_annotation] = Coalesce(Subquery(counts), 0)
+        return annotations
+
+    @property
+    def response_cache(self) -> Optional[ResponseCache]:
+        """ Cache of the rendered list pages, opt-in with cache_timeout """
+        return self._response_cache
+
+    @property
+    def conditional_get(self) -> Optional[ConditionalGet]:
+        """ ETag/Last-Modified validators of the list pages, opt-in with conditional_get """
+        return self._conditional_get
+
+    def validator_queryset(self, request, kwargs):
+        queryset = self.model._default_manager.filter(**self.key_filter_kwargs(kwargs))
+        search = request.GET.get('q')
+        if search and self.search_index is not None:
+            queryset = self.search_index.search(queryset, search)
+        return queryset
+
+    def model_dependencies(self):
+        dependencies = super().model_dependencies()
+        if self.related_counts:
+            dependencies += [column.model for column in self.related_columns]
+        return dependencies
+
+    # Query plan
+    @property
+    def select_related(self):
+        """ Relations joined in the list query: the displayed forward FKs unless overridden """
+        if self._select_related is not None:
+            return tuple(self._select_related)
+        return tuple(self.model_select_related_names(self.list_field_names()))
+
+    @property
+    def prefetch_related(self):
+        """ Relations prefetched by the list query: the displayed M2Ms unless overridden """
+        if self._prefetch_related is not None:
+            return tuple(self._prefetch_related)
+        return tuple(self.model_prefetch_related_names(self.list_field_names()))
+
+    @property
+    def restrict_columns(self):
+        """ If True, list queries load only the loaded_fields (deferring the other fields of the model) """
+        return self._restrict_columns
+
+    @property
+    def loaded_fields(self):
+        """ Fields loaded by the list query: pk, the columns of the list, the FKs (ids), the keyset keys and the
+        fields of the joined models (of every select_related path and its ancestors) but their
+        related_deferred_fields. Paths are always listed, since only() loads just the pk and the FKs of a path
+        not listed when one of its descendants is. """
+        opts = self.model._meta
+        names = [opts.pk.name]
+        for name in self.list_field_names():
+            field = opts.get_field(name)
+            if field.concrete and not field.many_to_many:
+                names.append(name)
+        names += [f.name for f in self.model_fks()]
+        names += [k.lstrip('-') for k in self.keyset_ordering or () if k.lstrip('-') != 'pk']
+        deferred = set(self.related_deferred_fields)
+        paths = {}
+        for path in self.select_related:
+            parts = path.split('__')
+            paths.update(dict.fromkeys('__'.join(parts[:i]) for i in range(1, len(parts) + 1)))
+        for path in paths:
+            names += [f'{path}__{f.name}' for f in self._related_model(path)._meta.concrete_fields
+                      if f'{path}__{f.name}' not in deferred]
+        return tuple(dict.fromkeys(names))
+
+    @property
+    def related_deferred_fields(self):
+        """ Fields of the joined models not loaded by the list query: their text, JSON and binary fields unless
+        overridden (an empty tuple loads them all) """
+        if self._related_deferred_fields is not None:
+            return tuple(self._related_deferred_fields)
+        deferred = []
+        for path in self.select_related:
+            deferred += [f'{path}__{f.name}' for f in self._related_model(path)._meta.concrete_fields
+                         if isinstance(f, (TextField, JSONField, BinaryField)) and not f.primary_key]
+        return tuple(deferred)
+
+    def _related_model(self, path) -> Type[Model]:
+        model = self.model
+        for name in path.split('__'):
+            model = model._meta.get_field(name).related_model
+        return model
+
+    def plan_queryset(self, queryset: QuerySet) -> QuerySet:
+        """ Apply the list query plan to queryset. Override to customize how list rows are loaded. """
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        if self.restrict_columns:
+            queryset = queryset.only(*self.loaded_fields)
+        if self.related_counts:
+            queryset = queryset.annotate(**self.related_count_annotations())
+        return queryset
+
     @property
     def route(self):
         return f'{self.name}'
 
+    @property
+    def route_kwargs(self):
+        return tuple(self.model_key_names())
+
     @property
     def route_name(self):
         return super().route_name + '_list'
 
 
+    def list_queryset(self, filter_kwargs=None, search=None) -> QuerySet:
+        """ Planned queryset of the list rows, filtered by filter_kwargs and by the full-text query search """
+        queryset = self.plan_queryset(self.model.objects.all())
+        if filter_kwargs:
+            queryset = queryset.filter(**filter_kwargs)
+        if search and self.search_index is not None:
+            queryset = self.search_index.search(queryset, search)
+        return queryset
+
+    def search_querystring(self, request):
+        """ Querystring prefix (with trailing &) keeping the search of request in pagination and export links """
+        q = request.GET.get('q')
+        return f'{urlencode({"q": q})}&' if q and self.search_index is not None else ''
+
     @property
     def paths(self, *args, **kwargs):
-        keys = [k for k in self.model_key_names()]
-        filters_path_str = [f"(?:/{k}-(?P<{k}>\d+))?" for k in keys]
-        filters_path_str = ''.join(filters_path_str)
-
-        filtered_path = re_path(f'^{self.route}{filters_path_str}$', self._get_view(*args, **kwargs).as_view(),
+        filtered_path = re_path(f'^{self.route}{self.filters_path}$', self.get_view(*args, **kwargs),
                                 name=self.route_name)
 
         # return [filtered_path, select_id_path_str]
@@ -213,16 +544,28 @@ class ListPage(CondorModelPage):
             model = self._model
             form_class = condor_bsmf_form(self._model, condor_fields=self._fields)
             template_name = self._template_name
+            paginator_class = CondorPaginator
 
             def get_key_filter_kwargs(iself):
-                return {key: iself.kwargs[key] for key in self.model_key_names() if key in iself.kwargs.keys()}
+                return self.key_filter_kwargs(iself.kwargs)
+
+            def get_paginator(iself, queryset, per_page, orphans=0, allow_empty_first_page=True, **kwargs):
+                return super().get_paginator(queryset, per_page, orphans, allow_empty_first_page,
+                                             count_strategy=self.count_strategy, **kwargs)
 
             def get_queryset(iself):
-                queryset = CondorListView.model.objects.all()
-                filter_kwargs = iself.get_key_filter_kwargs()
-                if len(filter_kwargs) > 0:
-                    return queryset.filter(**filter_kwargs)
-                return queryset
+                return self.list_queryset(iself.get_key_filter_kwargs(), iself.request.GET.get('q'))
+
+            def paginate_queryset(iself, queryset, page_size):
+                if self.pagination != KEYSET:
+                    return super().paginate_queryset(queryset, page_size)
+                paginator = KeysetPaginator(queryset, page_size, self.keyset_ordering)
+                try:
+                    page = paginator.page(after=iself.request.GET.get('after'),
+                                          before=iself.request.GET.get('before'))
+                except InvalidCursor:
+                    raise Http404('Invalid page cursor.')
+                return paginator, page, page.object_list, page.has_other_pages()
 
             def get_context_data(iself, **kwargs):
                 context = super().get_context_data(**kwargs)
@@ -230,24 +573,105 @@ class ListPage(CondorModelPage):
                 filter_str = ', '.join([f"{k}={v}" for k, v in filter_kwargs.items()])
                 context['query'] = filter_str
                 context['page'] = self
-                context['related_fk_models'] = {fk.id: fk.model for fk in self.model_reverse_fks()}
+                context['list_path'] = iself.request.path
+                context['search_query'] = iself.request.GET.get('q', '')
+                context['querystring'] = self.search_querystring(iself.request)
+                context['related_fk_models'] = {fk.name: fk.model for fk in self.model_reverse_fks()}
+                context['related_columns'] = self.related_columns
                 return context
 
-        return CondorListView
+        if not self.is_async:
+            return CondorListView
+
+        class CondorAsyncListView(CondorListView):
+            """ Count and rows of the page are loaded with the async ORM, the context is built in a sync thread and
+            the response rendered by the handler (templates may still access the database) """
+            async def get(iself, request, *args, **kwargs):
+                iself.object_list = iself.get_queryset()
+                iself._paginated = await iself.apaginate_queryset(iself.object_list, iself.get_paginate_by(
+                    iself.object_list))
+                return await sync_to_async(iself.render_list)()
+
+            async def apaginate_queryset(iself, queryset, page_size):
+                if self.pagination == KEYSET:
+                    paginator = KeysetPaginator(queryset, page_size, self.keyset_ordering)
+                    try:
+                        page = await paginator.apage(after=iself.request.GET.get('after'),
+                                                     before=iself.request.GET.get('before'))
+                    except InvalidCursor:
+                        raise Http404('Invalid page cursor.')
+                    return paginator, page, page.object_list, page.has_other_pages()
+                paginator = iself.get_paginator(queryset, page_size, orphans=iself.get_paginate_orphans(),
+                                                allow_empty_first_page=iself.get_allow_empty())
+                page = iself.kwargs.get(iself.page_kwarg) or iself.request.GET.get(iself.page_kwarg) or 1
+                try:
+                    page_number = int(page)
+                except ValueError:
+                    if page != 'last':
+                        raise Http404('Page is not “last”, nor can it be converted to an int.')
+                    await paginator.acount()
+                    page_number = paginator.num_pages
+                try:
+                    page = await paginator.apage(page_number)
+                except InvalidPage as e:
+                    raise Http404(f'Invalid page ({page_number}): {e}')
+                return paginator, page, page.object_list, page.has_other_pages()
+
+            def paginate_queryset(iself, queryset, page_size):
+                return iself._paginated
+
+            def render_list(iself):
+                return iself.render_to_response(iself.get_context_data())
+
+        return CondorAsyncListView
 
 
 
 class ListCRUDPage(ListPage):
     def __init__(self, model: Type[Model], page_name=None, list_paginated_by=30,
                  form_class=None, form_fields=None,
-                 list_fields=None, list_excluded_fields=('id',), **kwargs):
-        super().__init__(model, page_name, list_paginated_by, fields=list_fields, excluded_fields=list_excluded_fields)
+                 list_fields=None, list_excluded_fields=('id',), list_select_related=None, list_prefetch_related=None,
+                 pagination=OFFSET, keyset_ordering=None, count_strategy=EXACT, count_cache_timeout=60,
+                 count_estimate_cap=1000, searchable_fields=None, related_counts=False, export_chunk_size=2000,
+                 cache_timeout=None, conditional_get=False, last_modified_field=None, validators_fallback=VERSION,
+                 bulk=False, bulk_actions=None, bulk_batch_size=500, imports=False, import_batch_size=1000,
+                 import_natural_keys=None,
+                 async_view=None, api=False, restrict_columns=True, related_deferred_fields=None, **kwargs):
+        super().__init__(model, page_name, list_paginated_by, fields=list_fields, excluded_fields=list_excluded_fields,
+                         select_related=list_select_related, prefetch_related=list_prefetch_related,
+                         pagination=pagination, keyset_ordering=keyset_ordering, count_strategy=count_strategy,
+                         count_cache_timeout=count_cache_timeout, count_estimate_cap=count_estimate_cap,
+                         searchable_fields=searchable_fields, related_counts=related_counts,
+                         cache_timeout=cache_timeout, conditional_get=conditional_get,
+                         last_modified_field=last_modified_field, validators_fallback=validators_fallback,
+                         async_view=async_view, restrict_columns=restrict_columns,
+                         related_deferred_fields=related_deferred_fields)
         # self.list = ListPage(model, page_name, list_paginated_by, fields=form_fields)
         self.create = CreatePage(model, self, page_name, form_fields=form_fields, form_class=form_class)
-        self.read = ReadPage(model, page_name, form_fields=form_fields, form_class=form_class)
+        self.read = ReadPage(model, page_name, form_fields=form_fields, form_class=form_class,
+                             cache_timeout=cache_timeout, conditional_get=conditional_get,
+                             last_modified_field=last_modified_field, validators_fallback=validators_fallback,
+                             async_view=async_view)
         self.update = UpdatePage(model, self, page_name, form_fields=form_fields, form_class=form_class)
         self.delete = DeletePage(model, self, page_name, form_fields=form_fields, form_class=form_class)
+        self.export = ExportPage(self, page_name, chunk_size=export_chunk_size)
+        self.autocomplete = AutocompletePage(self, page_name)
+        # Bulk actions and imports, opt-in with bulk=True and imports=True
+        self.bulk = BulkActionPage(self, page_name, actions=bulk_actions, batch_size=bulk_batch_size) \
+            if bulk else None
+        self.imports = ImportPage(self, page_name, batch_size=import_batch_size, natural_keys=import_natural_keys) \
+            if imports else None
+        # JSON endpoints, opt-in with api=True
+        self.api_list = ApiListPage(self, page_name) if api else None
+        self.api_object = ApiObjectPage(self, page_name) if api else None
 
     @property
     def pages(self):
-        return self, self.create, self.read, self.update, self.delete
+        pages = self, self.create, self.read, self.update, self.delete, self.export, self.autocomplete
+        if self.bulk is not None:
+            pages += self.bulk,
+        if self.imports is not None:
+            pages += self.imports,
+        if self.api_list is not None:
+            pages += self.api_list, self.api_object
+        return pages
@@ -0,0 +1,128 @@
+import csv
+import json
+from typing import Type
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.urls import re_path
+from django.views import View
+
+from condor_navigator.page import CondorModelPage
+
+# Export formats
+CSV = 'csv'
+JSONL = 'jsonl'
+EXPORT_FORMATS = (CSV, JSONL)
+
+
+class _Echo:
+    """ File-like object returning what is written, to stream csv.writer rows """
+    def write(self, value):
+        return value
+
+
+class ExportJSONEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        try:
+            return super().default(o)
+        except TypeError:
+            return str(o)
+
+
+class ExportPage(CondorModelPage):
+    """ Streams the (filtered) rows of a ListPage as CSV or JSON lines, with the same columns of the list.
+
+    When the list page is async, rows are streamed from an async iterator: under ASGI a sync iterator would be
+    consumed (buffered) in full before sending the response.
+    """
+    supports_async = True
+
+    def __init__(self, list_page: 'ListPage', page_name=None, chunk_size=2000, formats=EXPORT_FORMATS):
+        super().__init__(list_page.model, page_name)
+        self._list_page = list_page
+        self._chunk_size = chunk_size
+        self._formats = tuple(formats)
+
+    @property
+    def list_page(self) -> 'ListPage':
+        return self._list_page
+
+    @property
+    def formats(self):
+        return self._formats
+
+    @property
+    def is_async(self) -> bool:
+        return self.list_page.is_async
+
+    @property
+    def route(self):
+        return f'{self.name}{self.list_page.filters_path}/export\\.(?P<fmt>{"|".join(self.formats)})'
+
+    @property
+    def route_kwargs(self):
+        return 'fmt',
+
+    @property
+    def route_name(self):
+        return super().route_name + '_export'
+
+    @property
+    def paths(self, *args, **kwargs):
+        return [re_path(f'^{self.route}$', self.get_view(*args, **kwargs), name=self.route_name)]
+
+    def export_queryset(self, filter_kwargs, search=None):
+        queryset = self.list_page.list_queryset(filter_kwargs, search)
+        if self.list_page.keyset_ordering is not None:
+            queryset = queryset.order_by(*self.list_page.keyset_ordering)
+        return queryset
+
+    def stream_csv(self, queryset):
+        columns = self.list_page.column_plan.columns
+        writer = csv.writer(_Echo())
+        yield writer.writerow([c.name for c in columns])
+        for obj in queryset.iterator(chunk_size=self._chunk_size):
+            yield writer.writerow([c.text(obj) for c in columns])
+
+    def stream_jsonl(self, queryset):
+        columns = self.list_page.column_plan.columns
+        for obj in queryset.iterator(chunk_size=self._chunk_size):
+            yield json.dumps({c.name: c.data(obj) for c in columns}, cls=ExportJSONEncoder) + '\n'
+
+    async def astream_csv(self, queryset):
+        columns = self.list_page.column_plan.columns
+        writer = csv.writer(_Echo())
+        yield writer.writerow([c.name for c in columns])
+        async for obj in queryset.aiterator(chunk_size=self._chunk_size):
+            yield writer.writerow([c.text(obj) for c in columns])
+
+    async def astream_jsonl(self, queryset):
+        columns = self.list_page.column_plan.columns
+        async for obj in queryset.aiterator(chunk_size=self._chunk_size):
+            yield json.dumps({c.name: c.data(obj) for c in columns}, cls=ExportJSONEncoder) + '\n'
+
+    def export_response(self, rows, fmt) -> StreamingHttpResponse:
+        response = StreamingHttpResponse(rows, content_type='text/csv' if fmt == CSV else 'application/jsonl')
+        response['Content-Disposition'] = f'attachment; filename="{self.name}.{fmt}"'
+        return response
+
+    def _get_view(self, *args, **kwargs) -> Type[View]:
+        class CondorExportView(View):
+            def get(iself, request, fmt, **kwargs):
+                queryset = self.export_queryset(self.list_page.key_filter_kwargs(kwargs), request.GET.get('q'))
+                rows = self.stream_csv(queryset) if fmt == CSV else self.stream_jsonl(queryset)
+                return self.export_response(rows, fmt)
+
+        if not self.is_async:
+            return CondorExportView
+
+        class CondorAsyncExportView(View):
+            async def get(iself, request, fmt, **kwargs):
+                # Building the queryset may query the database (search index lookup)
+                queryset = await sync_to_async(self.export_queryset)(self.list_page.key_filter_kwargs(kwargs),
+                                                                     request.GET.get('q'))
+                rows = self.astream_csv(queryset) if fmt == CSV else self.astream_jsonl(queryset)
+                return self.export_response(rows, fmt)
+
+        return CondorAsyncExportView
@@ -1,28 +1,42 @@
-from abc import ABC
-from typing import Type
+from typing import Type, List, Tuple
 
-from bootstrap_modal_forms.generic import BSModalCreateView, BSModalReadView, BSModalUpdateView, BSModalDeleteView
-from bootstrap_modal_forms.mixins import CreateUpdateAjaxMixin
-from django.db.models import Model, ManyToManyField, QuerySet
-from django.urls import reverse_lazy, re_path
+from django.db import transaction, router
+from django.db.models import Model, QuerySet
+from django.http import Http404, HttpResponseRedirect
+from django.urls import re_path
 from django.views import View
-from django.views.generic import ListView
-from django_addanother.views import CreatePopupMixin, UpdatePopupMixin
-from extra_views import FormSetView, CreateWithInlinesView, UpdateWithInlinesView, InlineFormSetFactory, \
-    ModelFormSetView, InlineFormSetView
+from extra_views import ModelFormSetView
 
+from condor_navigator.cache import bump_model_version
 from condor_navigator.forms import condor_bsmf_form
 from condor_navigator.page import CondorModelPage
+from condor_navigator.pagination import OFFSET, KEYSET, PAGINATION_MODES, EXACT, KeysetPaginator, InvalidCursor, \
+    CondorPaginator, normalize_keyset_ordering, get_count_strategy
+from condor_navigator.search import get_search_index
 
 
 class FormSetpage(CondorModelPage):
+    """ Editable table of the rows of a model, one page of rows at a time.
+
+    Pages are selected like in ListPage (offset or keyset pagination). On submit only the changed forms are saved:
+    changed rows with one bulk_update over the changed fields, new rows with bulk_create. Since they send no signals,
+    the full-text index of the model (if registered) is updated with the saved rows.
+    """
     def __init__(self, model: Type[Model], page_name=None, paginated_by=30, template_name=None,
-                 fields=None, excluded_fields=('id',)):
+                 fields=None, excluded_fields=('id',), pagination=OFFSET, keyset_ordering=None,
+                 count_strategy=EXACT, extra=1, batch_size=500):
         super().__init__(model, page_name)
+        assert pagination in PAGINATION_MODES, f'pagination must be one of {PAGINATION_MODES}'
         self._paginated_by = paginated_by
         self._template_name = "pages/formset.html" if template_name is None else template_name
         self._fields = "__all__" if fields is None else fields
         self._excluded_fields = tuple() if excluded_fields is None else excluded_fields
+        self._pagination = pagination
+        self._keyset_ordering = normalize_keyset_ordering(model, keyset_ordering)
+        self._count_strategy = get_count_strategy(count_strategy)
+        self._count_strategy.watch(model)
+        self._extra = extra
+        self._batch_size = batch_size
         self.title = self.title
 
     @property
@@ -33,38 +47,116 @@ class FormSetpage(CondorModelPage):
     def excluded_fields(self):
         return self._excluded_fields
 
+    @property
+    def pagination(self):
+        return self._pagination
+
+    @property
+    def ordering(self):
+        """ Ordering of the rows: the keyset ordering (pk by default) also for offset pagination """
+        return self._keyset_ordering
+
     @property
     def route(self):
         return f'{self.name}_formset'
 
+    @property
+    def route_kwargs(self):
+        return tuple(self.model_key_names())
+
     @property
     def route_name(self):
         return super().route_name + '_formset'
 
-
     @property
     def paths(self, *args, **kwargs):
-        filtered_path = re_path(f'{self.route}', self._get_view(*args, **kwargs).as_view(), name=self.route_name)
+        filtered_path = re_path(f'^{self.route}{self.filters_path}$', self.get_view(*args, **kwargs),
+                                name=self.route_name)
         return [filtered_path]
 
+    def formset_queryset(self, filter_kwargs=None) -> QuerySet:
+        queryset = self.model._default_manager.all()
+        if filter_kwargs:
+            queryset = queryset.filter(**filter_kwargs)
+        return queryset.order_by(*self.ordering)
+
+    def save_formset(self, formset) -> Tuple[List[Model], List[Model]]:
+        """ Save only the changed forms of formset, returns the (updated, created) objects """
+        concrete_fields = {f.name for f in self.model._meta.concrete_fields if not f.primary_key}
+        m2m_fields = {f.name for f in self.model._meta.many_to_many}
+        updated, created, update_fields, m2m_changes = [], [], set(), []
+        for form in formset.forms:
+            if not form.has_changed() or form in formset.deleted_forms:
+                continue
+            obj = form.instance
+            if obj.pk is None:
+                created.append(obj)
+            else:
+                changed = concrete_fields.intersection(form.changed_data)
+                if changed:
+                    updated.append(obj)
+                    update_fields |= changed
+            m2m_changes += [(obj, f, form.cleaned_data[f]) for f in m2m_fields.intersection(form.changed_data)]
+
+        using = router.db_for_write(self.model)
+        manager = self.model._default_manager.using(using)
+        with transaction.atomic(using=using):
+            if updated:
+                manager.bulk_update(updated, sorted(update_fields), batch_size=self._batch_size)
+            if created:
+                manager.bulk_create(created, batch_size=self._batch_size)
+            for obj, field_name, values in m2m_changes:
+                getattr(obj, field_name).set(values)
+        if updated or created:
+            bump_model_version(self.model)
+            search_index = get_search_index(self.model)
+            if search_index is not None:
+                search_index.index_objects(updated + created, using)
+        return updated, created
+
     def _get_view(self, *args, **kwargs) -> Type[View]:
         CondorViewMixin = self.get_condor_view_mixin()
 
-        class CondorFormSetView(CondorViewMixin, InlineFormSetView):
+        class CondorFormSetView(CondorViewMixin, ModelFormSetView):
             navigator = self.navigator
             model = self._model
             form_class = condor_bsmf_form(self._model, condor_fields=self._fields)
             template_name = self._template_name
+            factory_kwargs = {'extra': self._extra}
 
             def get_key_filter_kwargs(iself):
-                return {key: iself.kwargs[key] for key in self.model_key_names() if key in iself.kwargs.keys()}
+                return self.key_filter_kwargs(iself.kwargs)
+
+            def get_page(iself):
+                """ Page of the rows shown by a GET request """
+                queryset = self.formset_queryset(iself.get_key_filter_kwargs())
+                if self.pagination == KEYSET:
+                    paginator = KeysetPaginator(queryset, self._paginated_by, self.ordering)
+                    try:
+                        return paginator.page(after=iself.request.GET.get('after'),
+                                              before=iself.request.GET.get('before'))
+                    except InvalidCursor:
+                        raise Http404('Invalid cursor')
+                paginator = CondorPaginator(queryset, self._paginated_by, count_strategy=self._count_strategy)
+                return paginator.get_page(iself.request.GET.get('page'))
 
             def get_queryset(iself):
-                queryset = CondorFormSetView.model.objects.all()
-                filter_kwargs = iself.get_key_filter_kwargs()
-                if len(filter_kwargs) > 0:
-                    return queryset.filter(**filter_kwargs)
-                return queryset
+                if getattr(iself, '_queryset', None) is None:
+                    queryset = self.formset_queryset(iself.get_key_filter_kwargs())
+                    if iself.request.method == 'POST':
+                        # The rows of the submitted forms, wherever they are now in the ordering
+                        prefix = iself.get_prefix() or 'form'
+                        pks = [v for k, v in iself.request.POST.items()
+                               if k.startswith(f'{prefix}-') and k.endswith('-id') and v]
+                        iself._queryset = queryset.filter(pk__in=pks)
+                    else:
+                        iself.page_obj = iself.get_page()
+                        iself._queryset = queryset.filter(pk__in=[obj.pk for obj in iself.page_obj.object_list])
+                return iself._queryset
+
+            def formset_valid(iself, formset):
+                self.save_formset(formset)
+                return HttpResponseRedirect(iself.get_success_url())
 
             def get_context_data(iself, **kwargs):
                 context = super().get_context_data(**kwargs)
@@ -72,8 +164,9 @@ class FormSetpage(CondorModelPage):
                 filter_str = ', '.join([f"{k}={v}" for k, v in filter_kwargs.items()])
                 context['query'] = filter_str
                 context['page'] = self
-                context['related_fk_models'] = {fk.id: fk.model for fk in self.model_reverse_fks()}
+                context['page_obj'] = getattr(iself, 'page_obj', None)
+                context['querystring'] = ''
+                context['related_fk_models'] = {fk.name: fk.model for fk in self.model_reverse_fks()}
                 return context
 
         return CondorFormSetView
-
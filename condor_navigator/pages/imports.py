@@ -0,0 +1,299 @@
+import csv
+import io
+import json
+from itertools import islice
+from typing import Type, Dict, Iterator, Tuple, List, Optional, Set, Union
+
+from django import forms
+from django.core.exceptions import ValidationError, PermissionDenied
+from django.db import transaction, router, IntegrityError
+from django.db.models import Model, CharField
+from django.http import JsonResponse
+from django.views import View
+from django.views.generic import TemplateView
+
+from condor_navigator.cache import bump_model_version
+from condor_navigator.page import CondorModelPage
+from condor_navigator.pages.export import CSV, EXPORT_FORMATS
+
+# Separator of the values of M2M columns in csv files (jsonl files use lists)
+CSV_MULTIPLE_SEPARATOR = '|'
+
+
+class ResolvedModelChoiceField(forms.ModelChoiceField):
+    """ Model choice field taking its objects from a {value: object} map resolved for a whole batch of rows """
+    def __init__(self, field: forms.ModelChoiceField, resolved: Dict[str, Model]):
+        super().__init__(field.queryset, required=field.required, label=field.label, disabled=field.disabled)
+        self.resolved = resolved
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        try:
+            return self.resolved[str(value)]
+        except KeyError:
+            raise ValidationError(self.error_messages['invalid_choice'], code='invalid_choice')
+
+
+class ResolvedModelMultipleChoiceField(forms.ModelMultipleChoiceField):
+    """ Model multiple choice field taking its objects from a {value: object} map resolved for a batch of rows """
+    def __init__(self, field: forms.ModelMultipleChoiceField, resolved: Dict[str, Model]):
+        super().__init__(field.queryset, required=field.required, label=field.label, disabled=field.disabled)
+        self.resolved = resolved
+
+    def clean(self, value):
+        if not value:
+            if self.required:
+                raise ValidationError(self.error_messages['required'], code='required')
+            return []
+        missing = [v for v in value if str(v) not in self.resolved]
+        if missing:
+            raise ValidationError(self.error_messages['invalid_choice'], code='invalid_choice',
+                                  params={'value': missing[0]})
+        return [self.resolved[str(v)] for v in value]
+
+
+class ImportPage(CondorModelPage):
+    """ Imports an uploaded CSV or JSON lines file into the model of a ListCRUDPage.
+
+    The file is read as a stream, batch_size rows at a time. Every row is validated with the form of the page and
+    valid rows are inserted with bulk_create, each batch in a transaction, retried row by row when it violates a
+    database constraint. FK and M2M values (pks, or natural keys: values of a unique char field of the related model)
+    are resolved with one lookup per batch.
+    Returns a report with the number of created rows and the errors of the invalid rows. Users need the
+    permissions of the create page of the list.
+    """
+    def __init__(self, list_page: 'ListCRUDPage', page_name=None, batch_size=1000, natural_keys: Dict[str, str] = None,
+                 max_errors=1000, template_name=None):
+        super().__init__(list_page.model, page_name)
+        self._list_page = list_page
+        self._batch_size = batch_size
+        self._natural_keys = {} if natural_keys is None else dict(natural_keys)
+        self._max_errors = max_errors
+        self._template_name = "pages/import.html" if template_name is None else template_name
+
+    @property
+    def list_page(self) -> 'ListCRUDPage':
+        return self._list_page
+
+    @property
+    def formats(self):
+        return EXPORT_FORMATS
+
+    @property
+    def route(self):
+        return f'{self.name}/import'
+
+    @property
+    def route_name(self):
+        return super().route_name + '_import'
+
+    @property
+    def form(self) -> Type[forms.ModelForm]:
+        return self.list_page.create.form
+
+    def check_permissions(self, request):
+        """ Raise PermissionDenied if the user of request cannot create objects with the create page """
+        permissions = self.list_page.create.permissions
+        if permissions and not request.user.has_perms(permissions):
+            raise PermissionDenied
+
+    def natural_key(self, field) -> Optional[str]:
+        """ Field of the related model of field used to resolve values that are not pks """
+        if field.name in self._natural_keys:
+            return self._natural_keys[field.name]
+        char_fields = [f for f in field.related_model._meta.concrete_fields if isinstance(f, CharField)]
+        unique_fields = [f for f in char_fields if f.unique]
+        fields = unique_fields or char_fields
+        return fields[0].name if fields else None
+
+    # Reading
+    def read_rows(self, file, fmt) -> Iterator[Tuple[int, Union[Dict, ValueError]]]:
+        """ (line number, row) of the file, lazily. Lines that are not JSON objects give (line number, error). """
+        text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+        if fmt == CSV:
+            reader = csv.DictReader(text)
+            for row in reader:
+                yield reader.line_num, row
+        else:
+            for line_number, line in enumerate(text, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    yield line_number, ValueError(f'Invalid JSON: {e}')
+                    continue
+                yield line_number, row if isinstance(row, dict) else ValueError('Expected a JSON object')
+
+    def row_data(self, row: Dict, relation_fields) -> Dict:
+        data = {k: ('' if v is None else v) for k, v in row.items() if k is not None}
+        for field in relation_fields:
+            value = data.get(field.name)
+            if field.many_to_many and isinstance(value, str):
+                data[field.name] = [v.strip() for v in value.split(CSV_MULTIPLE_SEPARATOR) if v.strip()]
+        return data
+
+    # Resolving
+    def relation_fields(self, form_class):
+        return [f for f in self.model._meta.fields + self.model._meta.many_to_many
+                if (f.many_to_one or f.one_to_one or f.many_to_many) and f.name in form_class.base_fields]
+
+    def resolve(self, field, values: Set[str], resolved: Dict[str, Model]):
+        """ Add to resolved the related objects of field with pk or natural key in values (one query per kind) """
+        values = {v for v in values if v not in resolved}
+        if not values:
+            return
+        related = field.related_model
+        pks = []
+        for value in values:
+            try:
+                pks.append(related._meta.pk.to_python(value))
+            except ValidationError:
+                pass
+        for obj in related._default_manager.filter(pk__in=pks):
+            resolved[str(obj.pk)] = obj
+        key = self.natural_key(field)
+        remaining = values - resolved.keys()
+        if key is not None and remaining:
+            found: Dict[str, List[Model]] = {}
+            for obj in related._default_manager.filter(**{f'{key}__in': remaining}):
+                found.setdefault(str(getattr(obj, key)), []).append(obj)
+            # Ambiguous natural keys are left unresolved (invalid choice)
+            resolved.update({value: objs[0] for value, objs in found.items() if len(objs) == 1})
+
+    # Import
+    def add_error(self, report: Dict, line: int, errors: Dict):
+        report['invalid'] += 1
+        if len(report['errors']) < self._max_errors:
+            report['errors'].append({'line': line, 'errors': errors})
+
+    def import_rows(self, rows: Iterator[Tuple[int, Union[Dict, ValueError]]], using=None) -> Dict:
+        rows = iter(rows)
+        relation_fields = self.relation_fields(self.form)
+        relation_names = {f.name for f in relation_fields}
+
+        class ResolvedForm(self.form):
+            def _get_validation_exclusions(iself):
+                # Relations are resolved to existing objects: skip the per-row existence queries of the model
+                return set(super()._get_validation_exclusions()) | relation_names
+
+        resolved: Dict[str, Dict[str, Model]] = {f.name: {} for f in relation_fields}
+        using = router.db_for_write(self.model) if using is None else using
+        report = {'created': 0, 'invalid': 0, 'errors': []}
+        search_index = self.list_page.search_index
+        try:
+            while True:
+                chunk = list(islice(rows, self._batch_size))
+                if not chunk:
+                    break
+                batch = []
+                for line, row in chunk:
+                    if not isinstance(row, dict):
+                        message = str(row) if isinstance(row, ValueError) else 'Expected an object'
+                        self.add_error(report, line, {'__all__': [{'message': message, 'code': 'invalid'}]})
+                    else:
+                        batch.append((line, self.row_data(row, relation_fields)))
+                for field in relation_fields:
+                    values = set()
+                    for _, data in batch:
+                        value = data.get(field.name)
+                        values.update(str(v) for v in (value if isinstance(value, list) else [value])
+                                      if v not in ('', None))
+                    self.resolve(field, values, resolved[field.name])
+
+                lines, objects, m2m_values = [], [], []
+                for line, data in batch:
+                    form = ResolvedForm(data=data)
+                    for field in relation_fields:
+                        resolved_class = ResolvedModelMultipleChoiceField if field.many_to_many \
+                            else ResolvedModelChoiceField
+                        form.fields[field.name] = resolved_class(form.fields[field.name], resolved[field.name])
+                    if form.is_valid():
+                        lines.append(line)
+                        objects.append(form.instance)
+                        m2m_values.append({f.name: form.cleaned_data.get(f.name)
+                                           for f in relation_fields if f.many_to_many})
+                    else:
+                        self.add_error(report, line, form.errors.get_json_data())
+
+                created = self.create_batch(lines, objects, m2m_values, report, using)
+                if search_index is not None:
+                    search_index.index_objects(created, using)
+                report['created'] += len(created)
+        finally:
+            # Batches committed before a failing one are in the database: invalidate the caches in any case
+            bump_model_version(self.model)
+        return report
+
+    def create_batch(self, lines: List[int], objects: List[Model], m2m_values: List[Dict], report: Dict,
+                     using) -> List[Model]:
+        """ Insert the valid objects of a batch in a transaction, returning the created ones.
+
+        When the batch violates a database constraint (e.g. duplicated unique values in the file) it is retried row by
+        row, each row in a savepoint, and the rows that still fail are reported as errors of their line.
+        """
+        try:
+            with transaction.atomic(using=using):
+                created = self.model._default_manager.using(using).bulk_create(objects)
+                self.bulk_create_m2m(created, m2m_values, using)
+            return created
+        except IntegrityError:
+            pass
+        created = []
+        for line, obj, values in zip(lines, objects, m2m_values):
+            obj.pk = None
+            try:
+                with transaction.atomic(using=using):
+                    self.model._default_manager.using(using).bulk_create([obj])
+                    self.bulk_create_m2m([obj], [values], using)
+            except IntegrityError as e:
+                self.add_error(report, line, {'__all__': [{'message': str(e), 'code': 'integrity'}]})
+            else:
+                created.append(obj)
+        return created
+
+    def bulk_create_m2m(self, objects: List[Model], m2m_values: List[Dict], using):
+        """ Create the M2M rows of the created objects (whose pk is returned by the database) """
+        for field in self.model._meta.many_to_many:
+            through = field.remote_field.through
+            rows = [through(**{field.m2m_field_name(): obj, field.m2m_reverse_field_name(): target})
+                    for obj, values in zip(objects, m2m_values) if obj.pk is not None
+                    for target in values.get(field.name) or ()]
+            if rows:
+                through._default_manager.using(using).bulk_create(rows, ignore_conflicts=True)
+
+    def _get_view(self, *args, **kwargs) -> Type[View]:
+        CondorViewMixin = self.get_condor_view_mixin()
+
+        class ImportForm(forms.Form):
+            file = forms.FileField()
+            format = forms.ChoiceField(choices=[(fmt, fmt.upper()) for fmt in self.formats])
+
+        class CondorImportView(CondorViewMixin, TemplateView):
+            template_name = self._template_name
+
+            def dispatch(iself, request, *args, **kwargs):
+                self.check_permissions(request)
+                return super().dispatch(request, *args, **kwargs)
+
+            def get_context_data(iself, **kwargs):
+                context = super().get_context_data(**kwargs)
+                context.setdefault('form', ImportForm())
+                context['page'] = self
+                return context
+
+            def post(iself, request, *args, **kwargs):
+                form = ImportForm(request.POST, request.FILES)
+                if not form.is_valid():
+                    return iself.render_to_response(iself.get_context_data(form=form))
+                try:
+                    report = self.import_rows(self.read_rows(form.cleaned_data['file'], form.cleaned_data['format']))
+                except (ValueError, csv.Error) as e:
+                    form.add_error('file', str(e))
+                    return iself.render_to_response(iself.get_context_data(form=form))
+                if request.POST.get('report') == 'json':
+                    return JsonResponse(report)
+                return iself.render_to_response(iself.get_context_data(form=form, report=report))
+
+        return CondorImportView
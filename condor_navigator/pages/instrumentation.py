@@ -0,0 +1,47 @@
+from typing import Type
+
+from django.core.exceptions import PermissionDenied
+from django.http import JsonResponse, HttpResponseRedirect
+from django.views import View
+from django.views.generic import TemplateView
+
+from condor_navigator.instrumentation import store, HISTOGRAM_BUCKETS_MS
+from condor_navigator.page import CondorPage
+
+
+class InstrumentationPage(CondorPage):
+    """ Staff only report of the request statistics recorded by the instrumented pages, slowest routes first.
+    Returns JSON with format=json, POST resets the statistics. """
+    def __init__(self, name=None, template_name=None):
+        super().__init__(name)
+        self._template_name = "pages/instrumentation.html" if template_name is None else template_name
+        self.instrumented = False
+
+    def _get_view(self, *args, **kwargs) -> Type[View]:
+        CondorViewMixin = self.get_condor_view_mixin()
+
+        class CondorInstrumentationView(CondorViewMixin, TemplateView):
+            template_name = self._template_name
+
+            def dispatch(iself, request, *args, **kwargs):
+                if not request.user.is_staff:
+                    raise PermissionDenied
+                return super().dispatch(request, *args, **kwargs)
+
+            def get(iself, request, *args, **kwargs):
+                if request.GET.get('format') == 'json':
+                    return JsonResponse({'enabled': self.navigator.instrumentation, 'routes': store.stats()})
+                return super().get(request, *args, **kwargs)
+
+            def post(iself, request, *args, **kwargs):
+                store.reset()
+                return HttpResponseRedirect(request.path)
+
+            def get_context_data(iself, **kwargs):
+                context = super().get_context_data(**kwargs)
+                context['page'] = self
+                context['routes'] = store.stats()
+                context['buckets_ms'] = HISTOGRAM_BUCKETS_MS
+                return context
+
+        return CondorInstrumentationView
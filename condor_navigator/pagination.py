@@ -0,0 +1,322 @@
+import base64
+import hashlib
+import json
+from typing import Type, Tuple, List, Optional, Union
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import Paginator, Page, PageNotAnInteger, EmptyPage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Model, Q, QuerySet
+from django.utils.functional import cached_property
+
+from condor_navigator.cache import model_version, watch_model
+
+# Pagination modes
+OFFSET = 'offset'
+KEYSET = 'keyset'
+PAGINATION_MODES = (OFFSET, KEYSET)
+
+# Count strategies
+EXACT = 'exact'
+CACHED = 'cached'
+ESTIMATED = 'estimated'
+COUNT_STRATEGIES = (EXACT, CACHED, ESTIMATED)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def normalize_keyset_ordering(model: Type[Model], ordering=None) -> Tuple[str, ...]:
+    """ Normalize a keyset ordering for model, appending pk as tiebreaker when the last key is not unique """
+    ordering = ('pk',) if not ordering else tuple(ordering)
+    for key in ordering:
+        _key_field(model, key.lstrip('-'))
+    last = ordering[-1].lstrip('-')
+    if last != 'pk' and not _key_field(model, last).unique:
+        ordering = ordering + ('pk',)
+    return ordering
+
+
+def _key_field(model: Type[Model], name: str):
+    if name == 'pk':
+        return model._meta.pk
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        raise ValueError(f'Keyset key {name} is not a field of {model.__name__}')
+    if not field.concrete or field.many_to_many:
+        raise ValueError(f'Keyset key {name} of {model.__name__} must be a concrete field')
+    if field.null:
+        # NULL values have no place in the seek comparisons (key > NULL matches no row)
+        raise ValueError(f'Keyset key {name} of {model.__name__} must not be nullable')
+    return field
+
+
+class KeysetPage:
+    """ A page of a KeysetPaginator, exposing the subset of django Page used by list templates """
+    def __init__(self, object_list: List[Model], has_next: bool, has_previous: bool,
+                 next_cursor: Optional[str], previous_cursor: Optional[str]):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+
+class KeysetPaginator:
+    """ Seek paginator: pages are selected with a WHERE on an indexed unique ordering key instead of an OFFSET,
+    and no COUNT(*) is ever executed. Pages are addressed by opaque cursors encoding the key of a row.
+    """
+    def __init__(self, queryset: QuerySet, per_page: int, ordering=None):
+        self.object_list = queryset
+        self.per_page = int(per_page)
+        self.ordering = normalize_keyset_ordering(queryset.model, ordering)
+        self._fields = [_key_field(queryset.model, k.lstrip('-')) for k in self.ordering]
+
+    # Cursors
+    def encode_cursor(self, obj: Model) -> str:
+        values = [getattr(obj, f.attname) for f in self._fields]
+        data = json.dumps(values, cls=DjangoJSONEncoder, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(data).decode().rstrip('=')
+
+    def decode_cursor(self, cursor: str) -> list:
+        try:
+            data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            values = json.loads(data)
+            if not isinstance(values, list) or len(values) != len(self._fields):
+                raise InvalidCursor(cursor)
+            return [f.to_python(v) for f, v in zip(self._fields, values)]
+        except (ValueError, TypeError, ValidationError):
+            raise InvalidCursor(cursor)
+
+    def _seek_filter(self, values, backward=False) -> Q:
+        """ Rows strictly after (or before, if backward) the key values in the keyset ordering """
+        seek = Q()
+        for i, key in enumerate(self.ordering):
+            descending = key.startswith('-')
+            lookup = 'lt' if descending != backward else 'gt'
+            condition = Q(**{f'{key.lstrip("-")}__{lookup}': values[i]})
+            for previous_key, value in zip(self.ordering[:i], values[:i]):
+                condition &= Q(**{previous_key.lstrip('-'): value})
+            seek |= condition
+        return seek
+
+    def _page_queryset(self, after: str = None, before: str = None) -> QuerySet:
+        """ Rows of the page plus one, in reverse order when paging backward """
+        if before:
+            reverse_ordering = [k[1:] if k.startswith('-') else f'-{k}' for k in self.ordering]
+            queryset = self.object_list.filter(self._seek_filter(self.decode_cursor(before), backward=True))
+            return queryset.order_by(*reverse_ordering)[:self.per_page + 1]
+        queryset = self.object_list
+        if after:
+            queryset = queryset.filter(self._seek_filter(self.decode_cursor(after)))
+        return queryset.order_by(*self.ordering)[:self.per_page + 1]
+
+    def _page(self, rows: List[Model], after: str = None, before: str = None) -> KeysetPage:
+        if before:
+            has_previous, has_next = len(rows) > self.per_page, True
+            rows = rows[:self.per_page][::-1]
+        else:
+            has_previous, has_next = bool(after), len(rows) > self.per_page
+            rows = rows[:self.per_page]
+        next_cursor = self.encode_cursor(rows[-1]) if has_next and rows else None
+        previous_cursor = self.encode_cursor(rows[0]) if has_previous and rows else None
+        return KeysetPage(rows, has_next, has_previous, next_cursor, previous_cursor)
+
+    def page(self, after: str = None, before: str = None) -> KeysetPage:
+        return self._page(list(self._page_queryset(after, before)), after, before)
+
+    async def apage(self, after: str = None, before: str = None) -> KeysetPage:
+        return self._page([obj async for obj in self._page_queryset(after, before)], after, before)
+
+
+class ExactCount:
+    """ Exact COUNT(*) of the queryset at every request """
+    def watch(self, model: Type[Model]):
+        pass
+
+    def count(self, queryset: QuerySet) -> Tuple[int, bool]:
+        """ Return the (maybe approximate) number of rows of queryset, and whether it is exact """
+        return queryset.count(), True
+
+    async def acount(self, queryset: QuerySet) -> Tuple[int, bool]:
+        return await queryset.acount(), True
+
+
+class CachedCount(ExactCount):
+    """ Exact count kept in the django cache for timeout seconds, invalidated when the model data changes """
+    def __init__(self, timeout=60):
+        self.timeout = timeout
+
+    def watch(self, model: Type[Model]):
+        watch_model(model)
+
+    def _key(self, queryset: QuerySet) -> str:
+        query_hash = hashlib.md5(str(queryset.query).encode()).hexdigest()
+        return f'condor:count:{queryset.model._meta.label_lower}:{model_version(queryset.model)}:{query_hash}'
+
+    def count(self, queryset: QuerySet) -> Tuple[int, bool]:
+        key = self._key(queryset)
+        count = cache.get(key)
+        if count is None:
+            count = queryset.count()
+            cache.set(key, count, self.timeout)
+        return count, True
+
+    async def acount(self, queryset: QuerySet) -> Tuple[int, bool]:
+        key = self._key(queryset)
+        count = await cache.aget(key)
+        if count is None:
+            count = await queryset.acount()
+            await cache.aset(key, count, self.timeout)
+        return count, True
+
+
+class EstimatedCount(ExactCount):
+    """ Planner estimate when the database provides one (PostgreSQL), otherwise a count capped to cap rows.
+
+    Small results (below cap) are always counted exactly.
+    """
+    def __init__(self, cap=1000):
+        self.cap = cap
+
+    def count(self, queryset: QuerySet) -> Tuple[int, bool]:
+        estimate = planner_estimate(queryset)
+        if estimate is not None and estimate > self.cap:
+            return estimate, False
+        count = queryset.order_by()[:self.cap + 1].count()
+        return count, count <= self.cap
+
+    async def acount(self, queryset: QuerySet) -> Tuple[int, bool]:
+        if connections[queryset.db].vendor == 'postgresql':
+            return await sync_to_async(self.count)(queryset)
+        count = await queryset.order_by()[:self.cap + 1].acount()
+        return count, count <= self.cap
+
+
+def planner_estimate(queryset: QuerySet) -> Optional[int]:
+    """ Number of rows of queryset estimated by the database planner, None if not supported """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.order_by().values('pk').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def get_count_strategy(strategy: Union[str, ExactCount], timeout=60, cap=1000) -> ExactCount:
+    """ Count strategy instance from its name or from an instance """
+    if isinstance(strategy, ExactCount):
+        return strategy
+    assert strategy in COUNT_STRATEGIES, f'count strategy must be one of {COUNT_STRATEGIES} or an ExactCount instance'
+    if strategy == CACHED:
+        return CachedCount(timeout)
+    if strategy == ESTIMATED:
+        return EstimatedCount(cap)
+    return ExactCount()
+
+
+class ApproximatePage(Page):
+    """ Page of a CondorPaginator whose count is approximate: has_next is given by the rows actually found """
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+    def next_page_number(self):
+        return self.number + 1
+
+    @property
+    def num_pages_display(self):
+        """ Approximate number of pages: '~N' for planner estimates, 'N+' for capped counts """
+        num_pages = max(self.paginator.num_pages, self.number + int(self._has_next))
+        strategy = self.paginator.count_strategy
+        if isinstance(strategy, EstimatedCount) and self.paginator.count > strategy.cap + 1:
+            return f'~{num_pages}'
+        return f'{num_pages}+'
+
+
+class CondorPaginator(Paginator):
+    """ Paginator counting rows through a count strategy.
+
+    With approximate counts every page number is valid, and pages are sliced one row longer to know if a next page
+    exists.
+    """
+    def __init__(self, object_list, per_page, orphans=0, allow_empty_first_page=True,
+                 count_strategy: ExactCount = None, **kwargs):
+        super().__init__(object_list, per_page, orphans, allow_empty_first_page, **kwargs)
+        self.count_strategy = ExactCount() if count_strategy is None else count_strategy
+
+    @cached_property
+    def _count(self):
+        return self.count_strategy.count(self.object_list)
+
+    @cached_property
+    def count(self):
+        return self._count[0]
+
+    @property
+    def count_is_exact(self):
+        return self._count[1]
+
+    def validate_number(self, number):
+        if self.count_is_exact:
+            return super().validate_number(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages['invalid_page'])
+        if number < 1:
+            raise EmptyPage(self.error_messages['min_page'])
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if self.count_is_exact:
+            return super().page(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        return ApproximatePage(rows[:self.per_page], number, self, len(rows) > self.per_page)
+
+    async def acount(self) -> int:
+        """ Count the rows with the async ORM, later count/num_pages accesses use the result """
+        if '_count' not in self.__dict__:
+            self.__dict__['_count'] = await self.count_strategy.acount(self.object_list)
+        return self.count
+
+    async def apage(self, number):
+        """ Like page, loading the rows with the async ORM """
+        await self.acount()
+        number = self.validate_number(number)
+        if self.count_is_exact:
+            page = super().page(number)
+            page.object_list = [obj async for obj in page.object_list]
+            return page
+        bottom = (number - 1) * self.per_page
+        rows = [obj async for obj in self.object_list[bottom:bottom + self.per_page + 1]]
+        return ApproximatePage(rows[:self.per_page], number, self, len(rows) > self.per_page)
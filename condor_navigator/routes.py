@@ -0,0 +1,72 @@
+from typing import NamedTuple, Dict, Tuple, Optional
+
+from django.urls import reverse, get_script_prefix, NoReverseMatch
+from django.utils.translation import get_language
+
+# Placeholder value reversed in place of a route kwarg to find where the kwarg lands in the url
+SENTINEL = 918273645
+
+
+class RouteTemplate(NamedTuple):
+    """ Url of a route split around its single kwarg """
+    prefix: str
+    suffix: str
+
+    def format(self, value) -> str:
+        return f'{self.prefix}{value}{self.suffix}'
+
+
+class RouteUrlCache:
+    """ Cache of the registered routes urls, replacing a reverse() per url with a string interpolation.
+
+    Routes without kwargs are cached as plain urls, routes with one kwarg as a RouteTemplate.
+    When a route can not be templated (or the value is not an int) reverse() is used as fallback.
+    Urls are cached by script prefix and active language (i18n_patterns prefix urls with the language).
+    """
+    def __init__(self):
+        self._urls: Dict[Tuple[str, str, str], str] = {}
+        self._templates: Dict[Tuple[str, str, str, str], Optional[RouteTemplate]] = {}
+
+    def clear(self):
+        self._urls.clear()
+        self._templates.clear()
+
+    def template(self, route_name: str, kwarg='pk') -> Optional[RouteTemplate]:
+        key = (get_script_prefix(), get_language(), route_name, kwarg)
+        try:
+            return self._templates[key]
+        except KeyError:
+            pass
+        template = None
+        try:
+            url = reverse(route_name, kwargs={kwarg: SENTINEL})
+        except NoReverseMatch:
+            url = ''
+        if url.count(str(SENTINEL)) == 1:
+            template = RouteTemplate(*url.split(str(SENTINEL)))
+        self._templates[key] = template
+        return template
+
+    def url(self, route_name: str, value=None, kwarg='pk') -> str:
+        if value is None:
+            key = (get_script_prefix(), get_language(), route_name)
+            try:
+                return self._urls[key]
+            except KeyError:
+                url = self._urls[key] = reverse(route_name)
+                return url
+        if isinstance(value, int):
+            template = self.template(route_name, kwarg)
+            if template is not None:
+                return template.format(value)
+        return reverse(route_name, kwargs={kwarg: value})
+
+    def warm(self, pages):
+        """ Precompute the urls and templates of all the routes of pages """
+        for page in pages:
+            try:
+                self.url(page.route_name)
+            except NoReverseMatch:
+                pass
+            for kwarg in page.route_kwargs:
+                self.template(page.route_name, kwarg)
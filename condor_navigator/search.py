@@ -0,0 +1,231 @@
+import operator
+import time
+from functools import reduce
+from typing import Type, Dict, Tuple, Iterable, List
+
+from django.db import connections
+from django.db.models import Model, QuerySet, Q
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_save, post_delete
+
+# Annotation holding the rank of the rows of searched querysets
+RANK_ANNOTATION = 'condor_search_rank'
+
+
+class SQLiteFTSBackend:
+    """ SQLite FTS5 virtual table, rowid is the model pk. Ranked with bm25 (lower is better). """
+    rank_ordering = RANK_ANNOTATION
+
+    def __init__(self, index: 'SearchIndex', connection):
+        self.index = index
+        self.connection = connection
+        self.table = connection.ops.quote_name(index.table_name)
+
+    def create_sql(self) -> List[str]:
+        columns = ', '.join(self.connection.ops.quote_name(f) for f in self.index.fields)
+        return [f'CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING fts5({columns})']
+
+    def drop_sql(self) -> List[str]:
+        return [f'DROP TABLE IF EXISTS {self.table}']
+
+    def index_rows(self, cursor, rows: List[Tuple]):
+        columns = ', '.join(self.connection.ops.quote_name(f) for f in self.index.fields)
+        placeholders = ', '.join(['%s'] * (len(self.index.fields) + 1))
+        cursor.executemany(f'DELETE FROM {self.table} WHERE rowid = %s', [(row[0],) for row in rows])
+        cursor.executemany(f'INSERT INTO {self.table} (rowid, {columns}) VALUES ({placeholders})', rows)
+
+    def unindex_sql(self) -> str:
+        return f'DELETE FROM {self.table} WHERE rowid = %s'
+
+    def query(self, q: str) -> str:
+        # Every term is quoted (no FTS5 syntax from users) and matched as prefix
+        return ' '.join('"{}"*'.format(term.replace('"', '""')) for term in q.split())
+
+    def match_sql(self, q: str):
+        return f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s', [self.query(q)]
+
+    def rank_sql(self, q: str, pk_column: str):
+        return (f'SELECT bm25({self.table}) FROM {self.table} WHERE {self.table} MATCH %s AND rowid = {pk_column}',
+                [self.query(q)])
+
+
+class PostgresFTSBackend:
+    """ Table of tsvector documents with a GIN index, keyed by the model pk. Ranked with ts_rank. """
+    rank_ordering = f'-{RANK_ANNOTATION}'
+
+    def __init__(self, index: 'SearchIndex', connection):
+        self.index = index
+        self.connection = connection
+        self.table = connection.ops.quote_name(index.table_name)
+
+    def create_sql(self) -> List[str]:
+        pk_type = self.index.model._meta.pk.rel_db_type(self.connection)
+        gin_index = self.connection.ops.quote_name(f'{self.index.table_name}_gin')
+        return [f'CREATE TABLE IF NOT EXISTS {self.table} (id {pk_type} PRIMARY KEY, document tsvector NOT NULL)',
+                f'CREATE INDEX IF NOT EXISTS {gin_index} ON {self.table} USING GIN (document)']
+
+    def drop_sql(self) -> List[str]:
+        return [f'DROP TABLE IF EXISTS {self.table}']
+
+    def index_rows(self, cursor, rows: List[Tuple]):
+        cursor.executemany(f'INSERT INTO {self.table} (id, document) VALUES (%s, to_tsvector(%s::regconfig, %s)) '
+                           f'ON CONFLICT (id) DO UPDATE SET document = EXCLUDED.document',
+                           [(row[0], self.index.config, ' '.join(row[1:])) for row in rows])
+
+    def unindex_sql(self) -> str:
+        return f'DELETE FROM {self.table} WHERE id = %s'
+
+    def match_sql(self, q: str):
+        return (f'SELECT id FROM {self.table} WHERE document @@ websearch_to_tsquery(%s::regconfig, %s)',
+                [self.index.config, q])
+
+    def rank_sql(self, q: str, pk_column: str):
+        return (f'SELECT ts_rank(document, websearch_to_tsquery(%s::regconfig, %s)) FROM {self.table} '
+                f'WHERE id = {pk_column}', [self.index.config, q])
+
+
+BACKENDS = {'sqlite': SQLiteFTSBackend, 'postgresql': PostgresFTSBackend}
+
+
+class SearchIndex:
+    """ Full-text index over some fields of a model, stored in a shadow table kept in sync with model signals.
+
+    The shadow table is created (and filled) by the condor_search_index management command. Until it exists,
+    searches fall back to icontains lookups and signals do not touch it. A missing table is looked up again after
+    not_ready_ttl seconds, so that processes started before the command find it without a restart.
+    """
+    not_ready_ttl = 10
+
+    def __init__(self, model: Type[Model], fields: Iterable[str], config='simple'):
+        self.model = model
+        self.fields = tuple(fields)
+        self.config = config
+        self._ready: Dict[str, bool] = {}
+        # Time (monotonic) until which a missing table is not looked up again, by database
+        self._not_ready_until: Dict[str, float] = {}
+        for f in self.fields:
+            field = model._meta.get_field(f)
+            assert field.concrete and not field.many_to_many, f'Searchable field {f} must be a concrete field'
+
+    @property
+    def table_name(self):
+        return f'condor_fts_{self.model._meta.db_table}'
+
+    def backend(self, using='default'):
+        connection = connections[using]
+        backend_class = BACKENDS.get(connection.vendor)
+        return backend_class(self, connection) if backend_class is not None else None
+
+    def is_ready(self, using='default') -> bool:
+        """ True if the shadow table exists, memoized once found (a missing table is checked every not_ready_ttl) """
+        if self._ready.get(using):
+            return True
+        if time.monotonic() < self._not_ready_until.get(using, 0):
+            return False
+        ready = self.backend(using) is not None and self.table_name in connections[using].introspection.table_names()
+        if ready:
+            self._ready[using] = True
+        else:
+            self._not_ready_until[using] = time.monotonic() + self.not_ready_ttl
+        return ready
+
+    def document(self, obj: Model) -> Tuple:
+        values = [getattr(obj, f) for f in self.fields]
+        return (obj.pk,) + tuple('' if v is None else str(v) for v in values)
+
+    # Index maintenance
+    def create(self, using='default'):
+        backend = self.backend(using)
+        if backend is None:
+            raise NotImplementedError(f'Full-text search is not supported on {connections[using].vendor}')
+        with connections[using].cursor() as cursor:
+            for sql in backend.create_sql():
+                cursor.execute(sql)
+        self._ready[using] = True
+        self._not_ready_until.pop(using, None)
+
+    def drop(self, using='default'):
+        backend = self.backend(using)
+        if backend is not None:
+            with connections[using].cursor() as cursor:
+                for sql in backend.drop_sql():
+                    cursor.execute(sql)
+        self._ready.pop(using, None)
+        self._not_ready_until.pop(using, None)
+
+    def index_objects(self, objects: Iterable[Model], using='default'):
+        if not self.is_ready(using):
+            return
+        rows = [self.document(obj) for obj in objects]
+        if rows:
+            with connections[using].cursor() as cursor:
+                self.backend(using).index_rows(cursor, rows)
+
+    def unindex_pks(self, pks: Iterable, using='default'):
+        if not self.is_ready(using):
+            return
+        with connections[using].cursor() as cursor:
+            cursor.executemany(self.backend(using).unindex_sql(), [(pk,) for pk in pks])
+
+    def rebuild(self, using='default', chunk_size=2000):
+        """ Index all the model rows, returns the number of indexed rows """
+        count, batch = 0, []
+        for obj in self.model._default_manager.using(using).iterator(chunk_size=chunk_size):
+            batch.append(obj)
+            if len(batch) >= chunk_size:
+                self.index_objects(batch, using)
+                count, batch = count + len(batch), []
+        self.index_objects(batch, using)
+        return count + len(batch)
+
+    # Search
+    def search(self, queryset: QuerySet, q: str) -> QuerySet:
+        """ Filter queryset by the full-text query q, ordering rows by rank """
+        if not q.split():
+            return queryset
+        if not self.is_ready(queryset.db):
+            # Like the full-text match: every term must be found, in any of the fields
+            lookups = [reduce(operator.or_, [Q(**{f'{f}__icontains': term}) for f in self.fields]) for term in q.split()]
+            return queryset.filter(reduce(operator.and_, lookups))
+        backend = self.backend(queryset.db)
+        quote_name = backend.connection.ops.quote_name
+        pk_column = f'{quote_name(self.model._meta.db_table)}.{quote_name(self.model._meta.pk.column)}'
+        match_sql, match_params = backend.match_sql(q)
+        rank_sql, rank_params = backend.rank_sql(q, pk_column)
+        queryset = queryset.filter(pk__in=RawSQL(match_sql, match_params))
+        queryset = queryset.annotate(**{RANK_ANNOTATION: RawSQL(rank_sql, rank_params)})
+        return queryset.order_by(backend.rank_ordering, 'pk')
+
+
+_indexes: Dict[Type[Model], SearchIndex] = {}
+
+
+def _on_saved(sender, instance, using, **kwargs):
+    _indexes[sender].index_objects([instance], using)
+
+
+def _on_deleted(sender, instance, using, **kwargs):
+    _indexes[sender].unindex_pks([instance.pk], using)
+
+
+def register_search_index(model: Type[Model], fields: Iterable[str], config='simple') -> SearchIndex:
+    """ Register (once) the full-text index of model, keeping it in sync on save/delete. A model has one index:
+    registering it again with other fields or config raises ValueError. """
+    fields = tuple(fields)
+    index = _indexes.get(model)
+    if index is not None and (index.fields != fields or index.config != config):
+        raise ValueError(f'{model.__name__} already has a search index over {index.fields} ({index.config})')
+    if index is None:
+        _indexes[model] = SearchIndex(model, fields, config)
+        uid = f'condor_search_{model._meta.label_lower}'
+        post_save.connect(_on_saved, sender=model, dispatch_uid=uid)
+        post_delete.connect(_on_deleted, sender=model, dispatch_uid=uid)
+    return _indexes[model]
+
+
+def get_search_index(model: Type[Model]) -> SearchIndex:
+    return _indexes.get(model)
+
+
+def search_indexes() -> List[SearchIndex]:
+    return list(_indexes.values())
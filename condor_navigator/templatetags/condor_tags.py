@@ -8,6 +8,7 @@ from django.utils.html import format_html
 from django import template
 from recurrence.forms import RecurrenceField
 
+from condor_navigator.columns import RelatedColumn
 from condor_navigator.navigator import CondorNavigator
 from condor_navigator.page import CondorModelPage
 from condor_navigator.pages.crud import ListCRUDPage, CondorModelFormPage, ListPage
@@ -24,100 +25,25 @@ def is_recurrence_field(field):
 
 @register.filter(is_safe=True)
 def table_row(object: Model, page: ListPage):
-
-    html = []
-    data = []
-    for k, field in page.model_fields_map().items():
-        # if isinstance(field, ForeignObjectRel):
-        # if field.is_relation:
-        #     # attrib = object.__getattribute__(field.get_accessor_name())
-        #     continue
-
-        if page.fields !='__all__':
-            if k not in page.fields:
-                continue
-        if k in page.excluded_fields:
-            continue
-        if isinstance(field, ManyToOneRel) or isinstance(field, ManyToManyRel):
-            continue
-        attrib = object.__getattribute__(k)
-
-        col_value = str(attrib)
-        if k == 'id':
-            try:
-                page = page.navigator.get_model_default_page(object.__class__)
-                html.append("<td><a href='{}'><u>{}</u></a></td>")
-                if isinstance(page, ListCRUDPage):
-                    # data.append(reverse(pages.list.route_name_pk, kwargs={'pk': attrib}))
-                    data.append(reverse(page.route_name, kwargs={'pk': attrib}))
-                else:
-                    data.append(reverse(page.route_name))
-
-            except KeyError:
-                html.append("<td>{}</td>")
-
-        elif isinstance(attrib, Model):
-            try:
-                page = page.navigator.get_model_default_page(attrib.__class__)
-                if isinstance(page, ListCRUDPage):
-                    # data.append(reverse(pages.list.route_name_pk, kwargs={'pk': attrib.pk}))
-                    html.append("<td><a  class='bs-modal' data-form-url='{}' href='#'><u>{}</u></a></td>") # href='{}'
-                    # html.append("<td><a href='{}'><u>{}</u></a></td>")
-
-                    data.append(reverse(page.read.route_name, kwargs={'pk': attrib.pk}))
-                    # data.append(reverse(page.route_name, kwargs={'pk': attrib.pk}))
-                else:
-                    html.append("<td><a href='{}'><u>{}</u></a></td>")
-                    data.append(reverse(page.route_name))
-
-            except KeyError:
-                html.append("<td>{}</td>")
-
-        else:
-            html.append("<td>{}</td>")
-            try:
-                to_many_field_str = ', '.join([str(a) for a in attrib.all()])
-                col_value = to_many_field_str
-            except:
-                pass
-        data.append(col_value)
-
-
-    return format_html("".join(html), *data)
+    return page.column_plan.render_row(object)
 
 @register.filter(is_safe=True)
 def table_header(page: ListPage):
-    html = []
-    data = []
-    for k, field in page.model_fields_map().items():
-        # if field.is_relation:
-        #     continue
-
-        if page.fields != '__all__':
-            if k not in page.fields:
-                continue
-        if k in page.excluded_fields:
-            continue
-        if isinstance(field, ManyToOneRel) or isinstance(field, ManyToManyRel):
-            continue
-
-        if isinstance(field, ForeignKey):
-            field_related_page = page.navigator.get_model_default_page(field.related_model)
-            html.append("<th><a href='{}'><u>{}</u></a></th>")
-            data.append(reverse(field_related_page.route_name))
-            data.append(field.verbose_name)
-        # if isinstance(field, ManyToOneRel):
-        #     continue
-        #     field_related_page = page.navigator.get_model_default_page(field.related_model)
-        #     html.append("<th><a href='{}'><u>{}</u></a></th>")
-        #     data.append(reverse(field_related_page.route_name))
-        #     data.append(field.related_model)
-        else:
-            html.append("<th>{}</th>")
-            data.append(field.verbose_name)
-        # if isinstance(field, ForwardManyToManyDescriptor):
-        #     pass
-    return format_html("".join(html), *data)
+    return page.column_plan.render_header()
+
+@register.simple_tag(takes_context=True)
+def condor_menus(context):
+    """ Sidebar menus of the current user, rendered from the navigator menus cache """
+    navigator = context.get('navigator') or CondorNavigator()
+    user = context.get('user')
+    if user is None and context.get('request') is not None:
+        user = context['request'].user
+    return navigator.render_menus(user)
+
+@register.filter(is_safe=False)
+def related_count(object: Model, column: RelatedColumn):
+    """ Number of related rows of a reverse FK column, as annotated by the list query """
+    return getattr(object, column.count_annotation, None)
 
 
 
@@ -295,28 +221,40 @@ def default_url(object: PageModelObject):
     # page = CondorNavigator().get_model_default_page(object.__class__)
     route = default_route(object)
     if route is not None:
-        return reverse(route)
+        return CondorNavigator().route_url(route)
     return None
 
 @register.filter(is_safe=False)
 def create_url(object: PageModelObject):
-    return reverse(create_route(object))
+    return CondorNavigator().route_url(create_route(object))
 
 @register.filter(is_safe=False)
 def read_url(object: Model):
-    return reverse(read_route(object), args=[object.id])
+    return CondorNavigator().route_url(read_route(object), object.pk)
 
 
 @register.filter(is_safe=False)
 def update_url(object: Model):
-    return reverse(update_route(object), args=[object.id])
+    return CondorNavigator().route_url(update_route(object), object.pk)
 
 
 @register.filter(is_safe=False)
 def delete_url(object: Model):
-    return reverse(delete_route(object), args=[object.id])
+    return CondorNavigator().route_url(delete_route(object), object.pk)
 
 @register.filter(is_safe=False)
 def list_url(object: PageModelObject):
-    return reverse(list_route(object))
+    return CondorNavigator().route_url(list_route(object))
 
+@register.filter(is_safe=False)
+def route_url(route_name: str, pk=None):
+    """ Cached url of a registered route: {{ page.route_name|route_url }} or {{ route_name|route_url:object.pk }} """
+    return CondorNavigator().route_url(route_name, pk)
+
+@register.simple_tag
+def filter_url(obj: PageModelObject, key: str, value):
+    """ Url of the list of obj filtered by key=value: {% filter_url model fk object.pk %} """
+    page = get_page(obj)
+    if isinstance(page, ListPage):
+        return page.navigator.route_url(page.route_name, value, kwarg=key)
+    return f'{default_url(obj)}/{key}-{value}'
@@ -0,0 +1,198 @@
+""" Query budget checks of the registered pages, to catch N+1 queries in tests:
+
+    def test_query_budgets(self):
+        self.client.force_login(superuser)
+        assert_query_budgets(self.client, seed=lambda n: create_rows(n))
+
+Every page of the navigator is requested after seeding the data at each size. A page fails if its number of queries
+grows with the number of rows, or goes over its query_budget. Failures list the queries that grew, grouped by the
+template node and the code (view method, template tag) that issued them.
+"""
+import os
+import re
+import sys
+from collections import Counter
+from contextlib import ExitStack
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from asgiref.sync import async_to_sync
+from django.db import connections
+from django.urls import reverse, NoReverseMatch
+from django.views import View
+
+from condor_navigator.page import CondorPage
+
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+_DJANGO_DIR = os.path.dirname(os.path.abspath(__import__('django').__file__))
+_STDLIB_DIR = os.path.dirname(os.path.abspath(os.__file__))
+_NUMBERS = re.compile(r"\b\d+\b")
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+# Modules of condor_navigator wrapping the views (and this one): their frames do not tell who issued a query
+_DISPATCH_FILES = {os.path.join(_PACKAGE_DIR, name)
+                   for name in ('page.py', 'cache.py', 'instrumentation.py', 'testing.py')}
+_IN_LISTS = re.compile(r"IN \((?:\?, )*\?\)")
+
+
+class QueryBudgetError(AssertionError):
+    pass
+
+
+def normalize_sql(sql: str) -> str:
+    """ sql without literal values, so that the same query with different parameters has the same text """
+    sql = _NUMBERS.sub('?', _STRINGS.sub('?', sql))
+    return _IN_LISTS.sub('IN (...)', sql)
+
+
+def _is_project_code(filename: str) -> bool:
+    """ True for the files of condor_navigator and of the project, False for django, the stdlib and libraries """
+    if filename.startswith(_PACKAGE_DIR):
+        return True
+    return not filename.startswith((_DJANGO_DIR, _STDLIB_DIR)) and 'site-packages' not in filename
+
+
+def query_origin() -> str:
+    """ Template node, view method and code that issued the running query, read from the stack frames """
+    template, view, code = None, None, None
+    frame = sys._getframe(2)
+    while frame is not None and None in (template, view, code):
+        filename = frame.f_code.co_filename
+        if template is None and frame.f_code.co_name == 'render_annotated' and filename.startswith(_DJANGO_DIR):
+            node = frame.f_locals.get('self')
+            token, origin = getattr(node, 'token', None), getattr(node, 'origin', None)
+            if token is not None and origin is not None:
+                template = f'{origin.template_name}:{token.lineno} {token.contents[:60]!r}'
+        if view is None:
+            # type() does not evaluate lazy objects (e.g. request.user), which would query again
+            instance_type = type(frame.f_locals.get('self', frame.f_locals.get('iself')))
+            if issubclass(instance_type, View):
+                view = f'{instance_type.__name__}.{frame.f_code.co_name}'
+        if code is None and filename not in _DISPATCH_FILES and _is_project_code(filename):
+            code = f'{os.path.relpath(filename)}:{frame.f_lineno} in {frame.f_code.co_name}'
+        frame = frame.f_back
+    return ' via '.join(part for part in (template, view, code) if part) or 'unknown'
+
+
+class QueryRecorder:
+    """ execute_wrapper recording (origin, normalized sql) of the executed queries """
+    def __init__(self):
+        self.queries: List[Tuple[str, str]] = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append((query_origin(), normalize_sql(sql)))
+        return execute(sql, params, many, context)
+
+
+class PageQueries(NamedTuple):
+    route_name: str
+    url: str
+    status: int
+    queries: Tuple[Tuple[str, str], ...]
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+
+def page_url(page: CondorPage, pk=None) -> Optional[str]:
+    """ Url requested for page: without kwargs, or with the pk of an object or the first export format """
+    candidates = [{}]
+    if pk is not None:
+        candidates.append({'pk': pk})
+    if getattr(page, 'formats', None):
+        candidates.append({'fmt': page.formats[0]})
+    for kwargs in candidates:
+        try:
+            return reverse(page.route_name, kwargs=kwargs)
+        except NoReverseMatch:
+            pass
+    return None
+
+
+async def _aconsume(content):
+    async for _ in content:
+        pass
+
+
+def request_page(client, page: CondorPage) -> Optional[PageQueries]:
+    """ Request page with client recording its queries, None if no url of the page can be built """
+    model = getattr(page, 'model', None)
+    obj = model._default_manager.order_by('pk').first() if model is not None else None
+    url = page_url(page, obj.pk if obj is not None else None)
+    if url is None:
+        return None
+    recorder = QueryRecorder()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        response = client.get(url)
+        if getattr(response, 'is_async', False):
+            async_to_sync(_aconsume)(response.streaming_content)
+        elif getattr(response, 'streaming', False):
+            b''.join(response.streaming_content)
+    return PageQueries(page.route_name, url, response.status_code, tuple(recorder.queries))
+
+
+def grown_queries(small: PageQueries, large: PageQueries) -> List[Tuple[str, str, int, int]]:
+    """ (origin, sql, count at small size, count at large size) of the queries executed more times at large size """
+    small_counts, large_counts = Counter(small.queries), Counter(large.queries)
+    return sorted(((origin, sql, small_counts[(origin, sql)], n) for (origin, sql), n in large_counts.items()
+                   if n > small_counts[(origin, sql)]), key=lambda q: q[3] - q[2], reverse=True)
+
+
+def check_query_budgets(client, seed: Callable[[int], None], sizes: Sequence[int] = (10, 100), navigator=None,
+                        pages: Sequence[CondorPage] = None, exclude: Sequence[str] = ()) -> Tuple[List[str], Dict]:
+    """ Request every page (of navigator, by default the CondorNavigator) after seed(size) for every size.
+
+    seed(size) must create the rows of the pages (e.g. size rows per model). Returns the failure reports and
+    {route name: {size: PageQueries}}. Pages not answering 200 fail (exclude the pages that can not be requested
+    without parameters), pages without a url that can be built are not checked.
+    """
+    if navigator is None:
+        from condor_navigator.navigator import CondorNavigator
+        navigator = CondorNavigator()
+    pages = [p for p in (navigator.pages if pages is None else pages) if p.route_name not in exclude]
+    results: Dict[str, Dict[int, PageQueries]] = {}
+    for size in sizes:
+        seed(size)
+        for page in pages:
+            # Warm up the caches (forms, choices, counts, column plans) filled by the first request after seeding
+            request_page(client, page)
+            queries = request_page(client, page)
+            if queries is not None:
+                results.setdefault(page.route_name, {})[size] = queries
+
+    failures = []
+    for page in pages:
+        by_size = results.get(page.route_name, {})
+        if len(by_size) != len(sizes):
+            continue
+        errors = [f'status {q.status} at {size} rows' for size, q in by_size.items() if q.status != 200]
+        if errors:
+            failures.append(f'{page.route_name} ({by_size[min(sizes)].url}): ' + ', '.join(errors))
+            continue
+        small, large = by_size[min(sizes)], by_size[max(sizes)]
+        problems = []
+        if large.count > small.count:
+            problems.append(f'queries grow with rows: {small.count} at {min(sizes)} rows, '
+                            f'{large.count} at {max(sizes)} rows')
+        budget = page.query_budget
+        if budget is not None and max(q.count for q in by_size.values()) > budget:
+            problems.append(f'over budget: {max(q.count for q in by_size.values())} queries, budget {budget}')
+        if problems:
+            lines = [f'{page.route_name} ({large.url}): ' + '; '.join(problems)]
+            grown = grown_queries(small, large)
+            for origin, sql, n_small, n_large in grown[:10]:
+                lines.append(f'    {n_small} -> {n_large}  {origin}\n        {sql[:200]}')
+            if not grown:
+                for (origin, sql), n in Counter(large.queries).most_common(10):
+                    lines.append(f'    {n}x  {origin}\n        {sql[:200]}')
+            failures.append('\n'.join(lines))
+    return failures, results
+
+
+def assert_query_budgets(client, seed: Callable[[int], None], sizes: Sequence[int] = (10, 100), navigator=None,
+                         pages: Sequence[CondorPage] = None, exclude: Sequence[str] = ()):
+    """ Raise QueryBudgetError with the report of check_query_budgets if any page fails """
+    failures, _ = check_query_budgets(client, seed, sizes, navigator, pages, exclude)
+    if failures:
+        raise QueryBudgetError('Query budget check failed for %d pages:\n%s' % (len(failures), '\n'.join(failures)))
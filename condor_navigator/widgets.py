@@ -1,4 +1,5 @@
 from django.forms import DateTimeInput, DateInput
+from django_select2.forms import ModelSelect2Widget, ModelSelect2MultipleWidget
 
 class FengyuanChenDatePickerInput(DateInput):
     template_name = 'widgets/fengyuanchen_datepicker.html'
@@ -28,3 +29,22 @@ class BootstrapDatePickerInput(DateInput):
         context = super().get_context(name, value, attrs)
         context['widget']['datetimepicker_id'] = datetimepicker_id
         return context
+
+class CondorModelSelect2Mixin:
+    """ Select2 rendering only the selected options, the others are loaded from a condor AutocompletePage """
+    search_fields = ('pk',)
+
+    def __init__(self, data_url, attrs=None, **kwargs):
+        attrs = {'class': 'form-control', 'data-width': '100%', 'data-minimum-input-length': 0,
+                 **(attrs if attrs is not None else {})}
+        super().__init__(attrs=attrs, data_url=data_url, **kwargs)
+
+    def set_to_cache(self):
+        # The autocomplete page does not need the widget: nothing to store in the django-select2 cache
+        pass
+
+class CondorModelSelect2Widget(CondorModelSelect2Mixin, ModelSelect2Widget):
+    pass
+
+class CondorModelSelect2MultipleWidget(CondorModelSelect2Mixin, ModelSelect2MultipleWidget):
+    pass
@@ -0,0 +1,6 @@
+""" Tests of condor_navigator on a SQLite project with the models of tests.testapp.
+
+Run from the repository root:
+
+    python -m django test tests --settings=tests.settings
+"""
@@ -0,0 +1,87 @@
+import json
+
+from django.contrib.auth.models import User, Permission
+from django.test import TestCase, Client
+
+from tests.testapp.models import Category, Supplier, Product
+from tests.urls import navigator
+
+CSRF_SECRET = 'a' * 32
+
+
+class ApiTest(TestCase):
+    def setUp(self):
+        self.page = navigator.get_model_lcrud_page(Product)
+        for page in (self.page.create, self.page.update, self.page.delete):
+            self.addCleanup(setattr, page, 'permissions', page.permissions)
+        self.page.create.permissions = ['testapp.add_product']
+        self.page.update.permissions = ['testapp.change_product']
+        self.page.delete.permissions = ['testapp.delete_product']
+        self.user = User.objects.create_user('user', password='user')
+        self.client.force_login(self.user)
+        category = Category.objects.create(name='category')
+        self.acme = Supplier.objects.create(name='acme', category=category)
+        self.globex = Supplier.objects.create(name='globex', category=category)
+        self.product = Product.objects.create(name='table', supplier=self.acme)
+        Product.objects.create(name='chair', supplier=self.globex)
+        self.list_url = navigator.route_url(self.page.api_list.route_name)
+        self.object_url = navigator.route_url(self.page.api_object.route_name, self.product.pk)
+
+    def grant(self, *codenames):
+        self.user.user_permissions.add(*Permission.objects.filter(codename__in=codenames))
+        self.client.force_login(User.objects.get(pk=self.user.pk))
+
+    def send(self, method, url, data, client=None, **extra):
+        client = self.client if client is None else client
+        return getattr(client, method)(url, json.dumps(data), content_type='application/json', **extra)
+
+    def test_list_is_filtered_by_the_url(self):
+        data = self.client.get(f'{self.list_url}/supplier-{self.acme.pk}').json()
+        name = data['columns'].index('name')
+        self.assertEqual([row[name] for row in data['rows']], ['table'])
+        self.assertEqual(data['pagination']['count'], 1)
+
+    def test_writes_require_the_page_permissions(self):
+        self.assertEqual(self.send('post', self.list_url, {'name': 'desk', 'supplier': self.acme.pk}).status_code,
+                         403)
+        self.assertEqual(self.send('patch', self.object_url, {'name': 'renamed'}).status_code, 403)
+        self.assertEqual(self.client.delete(self.object_url).status_code, 403)
+        self.grant('change_product')
+        self.assertEqual(self.client.delete(self.object_url).status_code, 403)
+        self.assertEqual(Product.objects.count(), 2)
+
+    def test_create_update_delete(self):
+        self.grant('add_product', 'change_product', 'delete_product')
+        response = self.send('post', self.list_url, {'name': 'desk', 'supplier': self.acme.pk})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Product.objects.get(pk=response.json()['pk']).name, 'desk')
+
+        response = self.send('patch', self.object_url, {'description': 'oak'})
+        self.assertEqual(response.status_code, 200)
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.name, self.product.description), ('table', 'oak'))
+
+        response = self.send('put', self.object_url, {'description': 'pine'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('name', response.json()['errors'])
+
+        self.assertEqual(self.client.delete(self.object_url).status_code, 204)
+        self.assertFalse(Product.objects.filter(pk=self.product.pk).exists())
+        self.assertEqual(self.client.get(self.object_url).status_code, 404)
+
+    def test_invalid_json_and_methods(self):
+        self.grant('add_product', 'change_product')
+        response = self.client.post(self.list_url, '[1, 2]', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.send('put', self.list_url, {}).status_code, 405)
+        self.assertEqual(self.send('post', self.object_url, {}).status_code, 405)
+
+    def test_writes_are_csrf_protected(self):
+        self.grant('add_product')
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(User.objects.get(pk=self.user.pk))
+        data = {'name': 'desk', 'supplier': self.acme.pk}
+        self.assertEqual(self.send('post', self.list_url, data, client).status_code, 403)
+        client.cookies['csrftoken'] = CSRF_SECRET
+        response = self.send('post', self.list_url, data, client, HTTP_X_CSRFTOKEN=CSRF_SECRET)
+        self.assertEqual(response.status_code, 201)
@@ -0,0 +1,46 @@
+from asgiref.sync import iscoroutinefunction
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from tests.testapp.models import Category
+from tests.urls import navigator
+
+
+class AsyncViewsTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_superuser('admin', 'admin@example.com', 'admin')
+        self.page = navigator.get_model_lcrud_page(Category)
+        self.categories = [Category.objects.create(name=f'category {i:02}') for i in range(35)]
+        self.list_url = navigator.route_url(self.page.route_name)
+
+    def read_url(self, pk):
+        return navigator.route_url(self.page.read.route_name, pk)
+
+    def test_views_are_coroutines(self):
+        self.assertTrue(self.page.is_async)
+        self.assertTrue(iscoroutinefunction(self.page.get_view()))
+        self.assertTrue(iscoroutinefunction(self.page.read.get_view()))
+
+    async def test_list_is_paginated(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(self.list_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['object_list']), 30)
+        self.assertEqual(response.context['paginator'].count, 35)
+        response = await self.async_client.get(self.list_url, {'page': 'last'})
+        self.assertEqual([c.name for c in response.context['object_list']],
+                         [c.name for c in self.categories[30:]])
+        self.assertEqual((await self.async_client.get(self.list_url, {'page': 3})).status_code, 404)
+
+    async def test_read(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(self.read_url(self.categories[0].pk))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['object'], self.categories[0])
+        self.assertEqual((await self.async_client.get(self.read_url(0))).status_code, 404)
+
+    async def test_login_required(self):
+        response = await self.async_client.get(self.list_url)
+        self.assertEqual(response.status_code, 302)
+        response = await self.async_client.get(self.read_url(self.categories[0].pk))
+        self.assertEqual(response.status_code, 302)
@@ -0,0 +1,57 @@
+from django.contrib.auth.models import User, Permission
+from django.test import TestCase
+
+from tests.testapp.models import Category, Supplier, Product
+from tests.urls import navigator
+
+
+class BulkActionTest(TestCase):
+    def setUp(self):
+        self.page = navigator.get_model_lcrud_page(Product)
+        for page, codename in ((self.page.update, 'change_product'), (self.page.delete, 'delete_product')):
+            self.addCleanup(setattr, page, 'permissions', page.permissions)
+            page.permissions = [f'testapp.{codename}']
+        self.url = navigator.route_url(self.page.bulk.route_name)
+        self.user = User.objects.create_user('user', password='user')
+        self.client.force_login(self.user)
+        supplier = Supplier.objects.create(name='supplier', category=Category.objects.create(name='category'))
+        self.products = [Product.objects.create(name=f'product {i}', supplier=supplier) for i in range(4)]
+        self.selected = [p.pk for p in self.products[:2]]
+
+    def grant(self, codename):
+        self.user.user_permissions.add(Permission.objects.get(codename=codename))
+        self.client.force_login(User.objects.get(pk=self.user.pk))
+
+    def test_actions_require_the_page_permissions(self):
+        for action, data in (('delete', {}), ('update', {'field': 'name', 'value': 'renamed'})):
+            self.assertEqual(self.client.get(self.url, {'action': action, 'pks': self.selected}).status_code, 403)
+            response = self.client.post(self.url, {'action': action, 'pks': self.selected, **data})
+            self.assertEqual(response.status_code, 403)
+        self.assertEqual(Product.objects.filter(name__startswith='product').count(), 4)
+
+    def test_update_permission_does_not_allow_delete(self):
+        self.grant('change_product')
+        self.assertEqual(self.client.post(self.url, {'action': 'delete', 'pks': self.selected}).status_code, 403)
+
+    def test_delete_only_the_selected_rows(self):
+        self.grant('delete_product')
+        self.assertEqual(self.client.get(self.url, {'action': 'delete', 'pks': self.selected}).context['count'], 2)
+        response = self.client.post(self.url, {'action': 'delete', 'pks': self.selected})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(list(Product.objects.order_by('pk')), self.products[2:])
+
+    def test_update_only_the_selected_rows(self):
+        self.grant('change_product')
+        response = self.client.post(self.url, {'action': 'update', 'pks': self.selected, 'field': 'name',
+                                               'value': 'renamed'})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual([p.name for p in Product.objects.order_by('pk')],
+                         ['renamed', 'renamed', 'product 2', 'product 3'])
+
+    def test_invalid_update_value_is_not_applied(self):
+        self.grant('change_product')
+        response = self.client.post(self.url, {'action': 'update', 'pks': self.selected, 'field': 'supplier',
+                                               'value': '999'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['form'].errors)
+        self.assertEqual(Product.objects.filter(supplier_id=999).count(), 0)
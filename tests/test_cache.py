@@ -0,0 +1,71 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+
+from tests.testapp.models import Category, Supplier
+from tests.urls import navigator
+
+
+class ResponseCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'admin'))
+        self.category = Category.objects.create(name='category')
+        self.supplier = Supplier.objects.create(name='acme', category=self.category)
+        self.page = navigator.get_model_lcrud_page(Supplier)
+        self.url = navigator.route_url(self.page.route_name)
+
+    def get(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_responses_are_cached_until_a_save(self):
+        stats = self.page.response_cache.stats
+        first = self.get()
+        cached = self.get()
+        self.assertEqual(self.page.response_cache.stats['hits'], stats['hits'] + 1)
+        self.assertEqual(cached.content, first.content)
+
+        self.supplier.name = 'globex'
+        self.supplier.save()
+        self.assertContains(self.get(), 'globex')
+        # Saving a related model shown in the list also invalidates the cached pages
+        self.category.name = 'hardware'
+        self.category.save()
+        self.assertContains(self.get(), 'hardware')
+
+    def test_responses_are_cached_per_user_permissions(self):
+        self.get()
+        self.client.force_login(User.objects.create_user('user', password='user'))
+        stats = self.page.response_cache.stats
+        self.get()
+        self.assertEqual(self.page.response_cache.stats['misses'], stats['misses'] + 1)
+
+
+class ConditionalGetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'admin'))
+        self.supplier = Supplier.objects.create(name='acme', category=Category.objects.create(name='category'))
+        page = navigator.get_model_lcrud_page(Supplier)
+        self.urls = [navigator.route_url(page.route_name), navigator.route_url(page.read.route_name, self.supplier.pk)]
+
+    def test_unchanged_pages_answer_not_modified(self):
+        for url in self.urls:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.has_header('Last-Modified'))
+            not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(not_modified.status_code, 304)
+            self.assertEqual(not_modified.content, b'')
+
+    def test_saves_change_the_validators(self):
+        etags = [self.client.get(url)['ETag'] for url in self.urls]
+        self.supplier.name = 'globex'
+        self.supplier.save()
+        for url, etag in zip(self.urls, etags):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response['ETag'], etag)
+            self.assertContains(response, 'globex')
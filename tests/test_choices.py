@@ -0,0 +1,40 @@
+from django.test import TestCase
+
+from condor_navigator.choices import cached_choice_objects, clear_cached_choices, CachedModelChoiceField
+from condor_navigator.forms import inject_cached_choice_fields
+from condor_navigator.widgets import CondorModelSelect2Widget
+from tests.testapp.models import Category, Supplier
+from tests.urls import navigator
+
+
+class CachedChoicesTest(TestCase):
+    def setUp(self):
+        clear_cached_choices()
+        self.addCleanup(clear_cached_choices)
+        threshold = navigator.autocomplete_threshold
+        self.addCleanup(setattr, navigator, 'autocomplete_threshold', threshold)
+        navigator.autocomplete_threshold = 3
+        self.categories = [Category.objects.create(name=f'category {i}') for i in range(3)]
+
+    def test_small_tables_are_cached_until_a_save(self):
+        self.assertEqual(cached_choice_objects(Category.objects.all()), self.categories)
+        with self.assertNumQueries(0):
+            self.assertEqual(cached_choice_objects(Category.objects.all()), self.categories)
+        self.categories[0].name = 'renamed'
+        self.categories[0].save()
+        self.assertEqual(cached_choice_objects(Category.objects.all())[0].name, 'renamed')
+
+    def test_large_tables_are_not_cached(self):
+        Category.objects.create(name='category 3')
+        self.assertIsNone(cached_choice_objects(Category.objects.all()))
+        field = CachedModelChoiceField(Category.objects.all())
+        self.assertEqual(len(list(field.choices)), 5)
+
+    def test_cache_is_keyed_by_ordering(self):
+        self.assertEqual(cached_choice_objects(Category.objects.order_by('-pk')), self.categories[::-1])
+        self.assertEqual(cached_choice_objects(Category.objects.order_by('pk')), self.categories)
+
+    def test_autocomplete_fields_do_not_use_the_cache(self):
+        widgets = {'category': CondorModelSelect2Widget(data_url='/categories')}
+        self.assertNotIn('category', inject_cached_choice_fields(Supplier, widgets))
+        self.assertIs(inject_cached_choice_fields(Supplier, {})['category'], CachedModelChoiceField)
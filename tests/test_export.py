@@ -0,0 +1,39 @@
+import json
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from tests.testapp.models import Category, Supplier, Product
+from tests.urls import navigator
+
+
+class ExportTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_superuser('admin', 'admin@example.com', 'admin')
+        self.client.force_login(self.user)
+        self.categories = [Category.objects.create(name=f'category {i}') for i in range(3)]
+        supplier = Supplier.objects.create(name='supplier', category=self.categories[0])
+        for i in range(3):
+            Product.objects.create(name=f'product {i}', supplier=supplier)
+
+    def export_url(self, model, fmt):
+        return navigator.route_url(navigator.get_model_lcrud_page(model).export.route_name, fmt, kwarg='fmt')
+
+    def test_csv_export_is_streamed(self):
+        response = self.client.get(self.export_url(Product, 'csv'))
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'name,description,code,supplier')
+        self.assertEqual(lines[1:], [f'product {i},,,supplier' for i in range(3)])
+
+    def test_jsonl_export_is_streamed(self):
+        response = self.client.get(self.export_url(Product, 'jsonl'))
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row['name'] for row in rows], ['product 0', 'product 1', 'product 2'])
+
+    async def test_async_page_export_streams_an_async_iterator(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(self.export_url(Category, 'jsonl'))
+        self.assertTrue(response.is_async)
+        rows = [json.loads(line) async for chunk in response.streaming_content for line in chunk.decode().splitlines()]
+        self.assertEqual([row['name'] for row in rows], ['category 0', 'category 1', 'category 2'])
@@ -0,0 +1,26 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from condor_navigator.search import get_search_index
+from tests.testapp.models import Category, Supplier, Product
+from tests.urls import navigator, product_formset
+
+
+class FormSetSearchIndexTest(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'admin'))
+        self.index = get_search_index(Product)
+        self.index.create()
+        self.addCleanup(self.index.drop)
+        supplier = Supplier.objects.create(name='supplier', category=Category.objects.create(name='category'))
+        self.product = Product.objects.create(name='oak table', supplier=supplier)
+
+    def test_formset_edit_is_found_by_search(self):
+        url = navigator.route_url(product_formset.route_name)
+        response = self.client.post(url, {
+            'form-TOTAL_FORMS': 1, 'form-INITIAL_FORMS': 1,
+            'form-0-id': self.product.pk, 'form-0-name': 'walnut table', 'form-0-description': '',
+            'form-0-supplier': self.product.supplier_id})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(list(self.index.search(Product.objects.all(), 'walnut')), [self.product])
+        self.assertEqual(list(self.index.search(Product.objects.all(), 'oak')), [])
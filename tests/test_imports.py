@@ -0,0 +1,56 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+
+from tests.testapp.models import Category, Supplier, Product
+from tests.urls import navigator
+
+
+class ImportTest(TestCase):
+    def setUp(self):
+        self.page = navigator.get_model_lcrud_page(Product)
+        self.client.force_login(User.objects.create_superuser('admin', password='admin'))
+        category = Category.objects.create(name='category')
+        self.acme = Supplier.objects.create(name='acme', category=category)
+        self.url = navigator.route_url(self.page.imports.route_name)
+
+    def upload(self, content: str, fmt: str):
+        file = SimpleUploadedFile(f'products.{fmt}', content.encode())
+        response = self.client.post(self.url, {'file': file, 'format': fmt, 'report': 'json'})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_csv(self):
+        report = self.upload(f'name,description,supplier\r\n'
+                             f'table,"oak, solid",{self.acme.pk}\r\n'
+                             f'chair,,acme\r\n'
+                             f'lamp,,missing\r\n', 'csv')
+        self.assertEqual((report['created'], report['invalid']), (2, 1))
+        self.assertEqual(report['errors'][0]['line'], 4)
+        self.assertIn('supplier', report['errors'][0]['errors'])
+        self.assertEqual(Product.objects.get(name='table').description, 'oak, solid')
+        self.assertEqual(Product.objects.get(name='chair').supplier, self.acme)
+
+    def test_jsonl(self):
+        lines = [json.dumps({'name': 'table', 'supplier': self.acme.pk}), '', 'not json', '[1]',
+                 json.dumps({'name': 'chair', 'supplier': 'acme'})]
+        report = self.upload('\n'.join(lines) + '\n', 'jsonl')
+        self.assertEqual((report['created'], report['invalid']), (2, 2))
+        self.assertEqual([e['line'] for e in report['errors']], [3, 4])
+        self.assertEqual(set(Product.objects.values_list('name', flat=True)), {'table', 'chair'})
+
+    def test_constraint_violations_are_reported_per_row(self):
+        Product.objects.create(name='desk', code='D1', supplier=self.acme)
+        report = self.upload(f'name,code,supplier\n'
+                             f'table,T1,{self.acme.pk}\n'
+                             f'desk,D1,{self.acme.pk}\n'
+                             f'chair,C1,{self.acme.pk}\n'
+                             f'other table,T1,{self.acme.pk}\n', 'csv')
+        self.assertEqual((report['created'], report['invalid']), (2, 2))
+        self.assertEqual(report['errors'][0]['line'], 3)
+        self.assertIn('code', report['errors'][0]['errors'])
+        self.assertEqual(report['errors'][1]['line'], 5)
+        self.assertEqual(report['errors'][1]['errors']['__all__'][0]['code'], 'integrity')
+        self.assertEqual(set(Product.objects.values_list('code', flat=True)), {'D1', 'T1', 'C1'})
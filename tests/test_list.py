@@ -0,0 +1,39 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from tests.testapp.models import Category, Supplier, Product
+from tests.urls import navigator
+
+
+class ListRestrictedColumnsTest(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'admin'))
+        self.page = navigator.get_model_lcrud_page(Product)
+        self.url = navigator.route_url(self.page.route_name)
+
+    def create_products(self, n):
+        """ Add products up to n, each with its own supplier and category """
+        for i in range(Product.objects.count(), n):
+            category = Category.objects.create(name=f'category {i}', notes='notes ' * 100)
+            supplier = Supplier.objects.create(name=f'supplier {i}', category=category)
+            Product.objects.create(name=f'product {i}', supplier=supplier)
+
+    def test_nested_select_related_loads_the_fields_of_every_path(self):
+        self.assertEqual(self.page.select_related, ('supplier', 'supplier__category'))
+        self.assertIn('supplier__name', self.page.loaded_fields)
+        self.assertIn('supplier__category__name', self.page.loaded_fields)
+        self.assertNotIn('supplier__category__notes', self.page.loaded_fields)
+        with CaptureQueriesContext(connection) as queries:
+            list(self.page.list_queryset())
+        self.assertNotIn('"notes"', queries[0]['sql'])
+
+    def test_nested_select_related_query_count(self):
+        for n in (1, 10):
+            self.create_products(n)
+            self.client.get(self.url)
+            with self.assertNumQueries(4):
+                response = self.client.get(self.url)
+            self.assertEqual(response.status_code, 200)
+            self.assertContains(response, f'supplier {n - 1}')
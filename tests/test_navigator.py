@@ -0,0 +1,38 @@
+import warnings
+
+from django.test import SimpleTestCase
+
+from condor_navigator.navigator import CondorNavigator, Singleton
+from condor_navigator.pages.index import IndexPage
+from condor_navigator.pages.instrumentation import InstrumentationPage
+
+
+class NavigatorRegistryTest(SimpleTestCase):
+    def setUp(self):
+        # A new navigator, restoring the one of tests.urls afterwards
+        original = Singleton._instances.pop(CondorNavigator)
+        self.addCleanup(Singleton._instances.__setitem__, CondorNavigator, original)
+        self.navigator = CondorNavigator()
+
+    def test_duplicate_route_name_replaces_the_page_with_a_warning(self):
+        first, second = IndexPage('home'), IndexPage('home')
+        self.navigator.add_page(first)
+        with self.assertWarns(RuntimeWarning):
+            self.navigator.add_page(second)
+        self.assertIs(self.navigator.get_page(first.route_name), second)
+        self.assertEqual([p for p in self.navigator.pages if p.route_name == first.route_name], [second])
+
+    def test_registering_the_same_page_again_does_not_warn(self):
+        page = IndexPage('home')
+        self.navigator.add_page(page)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            self.navigator.add_page(page)
+        self.assertEqual(caught, [])
+        self.assertIs(self.navigator.get_page(page.route_name), page)
+
+    def test_instrumentation_page_is_added_only_when_enabled(self):
+        self.assertFalse(any(isinstance(p, InstrumentationPage) for p in self.navigator.pages))
+        Singleton._instances.pop(CondorNavigator)
+        navigator = CondorNavigator(instrumentation=True)
+        self.assertEqual([p.name for p in navigator.pages if isinstance(p, InstrumentationPage)], ['instrumentation'])
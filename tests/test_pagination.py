@@ -0,0 +1,72 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+
+from condor_navigator.pagination import normalize_keyset_ordering, CachedCount, EstimatedCount, CondorPaginator
+from tests.testapp.models import Category, Supplier
+from tests.urls import navigator
+
+
+class KeysetPaginationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'admin'))
+        category = Category.objects.create(name='category')
+        self.suppliers = [Supplier.objects.create(name=f'supplier {i}', category=category) for i in range(5)]
+        self.url = navigator.route_url(navigator.get_model_lcrud_page(Supplier).route_name)
+
+    def get_page(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.context['page_obj']
+
+    def test_forward_and_backward_cursors(self):
+        first = self.get_page()
+        self.assertEqual(list(first), self.suppliers[:2])
+        self.assertFalse(first.has_previous())
+        second = self.get_page(after=first.next_cursor)
+        self.assertEqual(list(second), self.suppliers[2:4])
+        last = self.get_page(after=second.next_cursor)
+        self.assertEqual(list(last), self.suppliers[4:])
+        self.assertFalse(last.has_next())
+        self.assertEqual(list(self.get_page(before=last.previous_cursor)), self.suppliers[2:4])
+        self.assertEqual(list(self.get_page(before=second.previous_cursor)), self.suppliers[:2])
+
+    def test_invalid_cursor_is_not_found(self):
+        self.assertEqual(self.client.get(self.url, {'after': 'not-a-cursor'}).status_code, 404)
+        self.assertEqual(self.client.get(self.url, {'before': 'WzEsMl0'}).status_code, 404)
+
+    def test_nullable_keys_are_rejected(self):
+        with self.assertRaises(ValueError):
+            normalize_keyset_ordering(Supplier, ('rating',))
+
+
+class CountStrategiesTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        for i in range(5):
+            Category.objects.create(name=f'category {i}')
+
+    def test_cached_count_is_invalidated_on_save(self):
+        strategy = CachedCount()
+        strategy.watch(Category)
+        self.assertEqual(strategy.count(Category.objects.all()), (5, True))
+        with self.assertNumQueries(0):
+            self.assertEqual(strategy.count(Category.objects.all()), (5, True))
+        Category.objects.create(name='category 5')
+        self.assertEqual(strategy.count(Category.objects.all()), (6, True))
+
+    def test_estimated_count_is_capped(self):
+        self.assertEqual(EstimatedCount(cap=10).count(Category.objects.all()), (5, True))
+        self.assertEqual(EstimatedCount(cap=3).count(Category.objects.all()), (4, False))
+
+    def test_approximate_count_pages(self):
+        paginator = CondorPaginator(Category.objects.order_by('pk'), 2, count_strategy=EstimatedCount(cap=3))
+        self.assertFalse(paginator.count_is_exact)
+        page = paginator.page(2)
+        self.assertEqual([c.name for c in page], ['category 2', 'category 3'])
+        self.assertTrue(page.has_next())
+        self.assertEqual(page.num_pages_display, '3+')
+        last = paginator.page(3)
+        self.assertEqual(len(last), 1)
+        self.assertFalse(last.has_next())
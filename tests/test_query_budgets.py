@@ -0,0 +1,28 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from condor_navigator.testing import assert_query_budgets, QueryBudgetError
+from tests.testapp.models import Category, Supplier, Product
+from tests.urls import navigator
+
+
+def seed(size):
+    """ size categories, suppliers and products (rows are added to the ones of the previous sizes) """
+    for i in range(Category.objects.count(), size):
+        category = Category.objects.create(name=f'category {i}')
+        supplier = Supplier.objects.create(name=f'supplier {i}', category=category, rating=i % 5)
+        Product.objects.create(name=f'product {i}', supplier=supplier)
+
+
+class QueryBudgetsTest(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'admin'))
+        # The bulk page answers 400 without the selected action and rows
+        self.bulk_route = navigator.get_model_lcrud_page(Product).bulk.route_name
+
+    def test_pages_do_not_grow_with_rows(self):
+        assert_query_budgets(self.client, seed, sizes=(3, 12), exclude=(self.bulk_route,))
+
+    def test_pages_not_answering_200_fail(self):
+        with self.assertRaisesMessage(QueryBudgetError, f'{self.bulk_route} (/product/bulk): status 400 at 3 rows'):
+            assert_query_budgets(self.client, seed, sizes=(3, 12))
@@ -0,0 +1,20 @@
+from django.conf.urls.i18n import i18n_patterns
+from django.http import HttpResponse
+from django.test import SimpleTestCase, override_settings
+from django.urls import path
+from django.utils import translation
+
+from condor_navigator.routes import RouteUrlCache
+
+urlpatterns = i18n_patterns(path('items', HttpResponse, name='items'),
+                            path('items/<int:pk>', HttpResponse, name='item'))
+
+
+@override_settings(ROOT_URLCONF=__name__, LANGUAGES=[('en', 'English'), ('it', 'Italian')])
+class RouteUrlCacheTest(SimpleTestCase):
+    def test_urls_follow_the_active_language(self):
+        urls = RouteUrlCache()
+        for language in ('en', 'it', 'en'):
+            with translation.override(language):
+                self.assertEqual(urls.url('items'), f'/{language}/items')
+                self.assertEqual(urls.url('item', 7), f'/{language}/items/7')
@@ -0,0 +1,55 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from condor_navigator.search import get_search_index, register_search_index
+from tests.testapp.models import Category, Supplier, Product
+from tests.urls import navigator
+
+
+class SearchTest(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'admin'))
+        self.index = get_search_index(Product)
+        supplier = Supplier.objects.create(name='supplier', category=Category.objects.create(name='category'))
+        self.oak_table = Product.objects.create(name='oak table', description='solid wood', supplier=supplier)
+        self.oak_chair = Product.objects.create(name='oak chair', supplier=supplier)
+        self.pine_table = Product.objects.create(name='pine table', supplier=supplier)
+
+    def search(self, q):
+        return set(self.index.search(Product.objects.all(), q))
+
+    def assert_searches(self):
+        self.assertEqual(self.search('oak'), {self.oak_table, self.oak_chair})
+        self.assertEqual(self.search('oak table'), {self.oak_table})
+        self.assertEqual(self.search('table wood'), {self.oak_table})
+        self.assertEqual(self.search('walnut'), set())
+
+    def test_fallback_search_matches_every_term(self):
+        self.assertFalse(self.index.is_ready())
+        self.assert_searches()
+
+    def test_full_text_search_matches_every_term(self):
+        self.index.create()
+        self.addCleanup(self.index.drop)
+        self.index.rebuild()
+        self.assert_searches()
+
+    def test_saves_update_the_index(self):
+        self.index.create()
+        self.addCleanup(self.index.drop)
+        self.index.rebuild()
+        self.pine_table.name = 'walnut table'
+        self.pine_table.save()
+        self.assertEqual(self.search('walnut'), {self.pine_table})
+        self.oak_chair.delete()
+        self.assertEqual(self.search('oak'), {self.oak_table})
+
+    def test_list_page_search(self):
+        response = self.client.get(navigator.route_url(navigator.get_model_lcrud_page(Product).route_name),
+                                   {'q': 'oak table'})
+        self.assertEqual(list(response.context['object_list']), [self.oak_table])
+
+    def test_model_has_one_index(self):
+        self.assertIs(register_search_index(Product, ('name', 'description')), self.index)
+        with self.assertRaises(ValueError):
+            register_search_index(Product, ('name',))
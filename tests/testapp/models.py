@@ -0,0 +1,28 @@
+from django.db import models
+
+
+class Category(models.Model):
+    name = models.CharField(max_length=64)
+    notes = models.TextField(blank=True, default='')
+
+    def __str__(self):
+        return self.name
+
+
+class Supplier(models.Model):
+    name = models.CharField(max_length=64)
+    category = models.ForeignKey(Category, on_delete=models.CASCADE)
+    rating = models.IntegerField(null=True, blank=True)
+
+    def __str__(self):
+        return self.name
+
+
+class Product(models.Model):
+    name = models.CharField(max_length=64)
+    description = models.TextField(blank=True, default='')
+    code = models.CharField(max_length=16, unique=True, null=True, blank=True)
+    supplier = models.ForeignKey(Supplier, on_delete=models.CASCADE)
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,20 @@
+from django.urls import path, include
+from django.views.i18n import JavaScriptCatalog
+
+from condor_navigator.navigator import CondorNavigator
+from condor_navigator.pages.formset import FormSetpage
+from condor_navigator.pagination import KEYSET
+from tests.testapp.models import Category, Supplier, Product
+
+navigator = CondorNavigator()
+navigator.register_model(Category, menus='shop', lcrud_page_kwargs={'async_view': True})
+navigator.register_model(Supplier, menus='shop', list_paginated_by=2, pagination=KEYSET,
+                         lcrud_page_kwargs={'cache_timeout': 60, 'conditional_get': True})
+navigator.register_model(Product, menus='shop', searchable_fields=('name', 'description'),
+                         lcrud_page_kwargs={'list_select_related': ('supplier', 'supplier__category'),
+                                            'bulk': True, 'imports': True, 'api': True})
+product_formset = FormSetpage(Product, fields=('name', 'description', 'supplier'))
+navigator.add_page(product_formset)
+
+urlpatterns = [path('jsi18n/', JavaScriptCatalog.as_view(), name='jsi18n'),
+               path('select2/', include('django_select2.urls'))] + navigator.urls